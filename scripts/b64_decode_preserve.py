@@ -16,41 +16,164 @@ b64_decode_preserve.py
                               По умолчанию: "\\n".
   --no-sep                    не добавлять никакого разделителя между payload'ами (эквивалент --sep '')
   --quiet                     не печатать прогресс
+  --threads N                 декодировать в N потоках (запись остаётся последовательной и по порядку)
+  --io-uring                  (Linux) в режиме --one-file-per-payload отправлять запись/закрытие
+                              файлов пачками через io_uring (нужен пакет liburing, ядро >= 5.6)
 Примеры:
   python3 b64_decode_preserve.py -i encoded.txt -o decoded_all.bin
   python3 b64_decode_preserve.py -i encoded.txt -o decoded_dir/ --one-file-per-payload --ext .txt
   python3 b64_decode_preserve.py -i encoded.txt -o decoded_all.txt --sep "\\n"
   python3 b64_decode_preserve.py -i encoded.txt -o decoded_all.bin --no-sep
+  python3 b64_decode_preserve.py -i encoded.txt -o decoded_dir/ --one-file-per-payload --io-uring
 """
 import argparse
 import base64
 import binascii
 import codecs
+import concurrent.futures
+from collections import deque
+import errno
+import os
 from pathlib import Path
 import sys
 
-def decode_line(b64_line: str, strip: bool = True):
+# pybase64 (SIMD-декодер libbase64), если установлен — для быстрого строгого декодирования
+try:
+    from pybase64 import b64decode as _fast_b64decode
+except ImportError:
+    _fast_b64decode = base64.b64decode
+
+try:
+    import liburing
+except Exception:
+    liburing = None
+
+URING_DEPTH = 256
+
+# Сколько строк base64 декодировать одним вызовом в агрегатном режиме
+DECODE_GROUP = 256
+
+# Сколько строк отдавать одному потоку за раз при --threads > 1
+THREAD_CHUNK = DECODE_GROUP * 16
+
+# Сколько буферов отдавать в один writev (не больше системного IOV_MAX)
+try:
+    IOV_BATCH = min(1024, os.sysconf('SC_IOV_MAX'))
+except (AttributeError, ValueError, OSError):
+    IOV_BATCH = 1024
+
+# Сколько байт AggregateWriter копит до записи, даже если буферов меньше IOV_BATCH:
+# без этого предела пачка из крупных payload'ов (и их memoryview на буферы групп) раздувала память
+AGGREGATE_FLUSH_BYTES = 1 << 20
+
+def decode_line(b64_line: bytes, strip: bool = True):
     """
-    Декодирует одну строку base64 в байты.
+    Декодирует одну строку base64 (байты, как прочитаны из файла) в байты.
     Если strip=True, предварительно обрезаем пробелы и перевод строки.
     Возвращает байты или возбуждает ValueError при ошибке декодирования.
     """
     s = b64_line if not strip else b64_line.strip()
     # Пропускаем пустые строки (возвращаем None)
-    if s == "":
+    if not s:
         return None
+    # base64 — чистый ASCII; прочие байты считаем ошибкой, а не мусором для отбрасывания
+    if not s.isascii():
+        raise ValueError("Invalid base64 data: non-ASCII characters in line")
     try:
-        data = base64.b64decode(s, validate=True)
+        data = _fast_b64decode(s, validate=True)
         return data
     except binascii.Error as e:
-        # пробуем более толерантно (в случае, если нет паддинга '=' и т.д.)
+        # пробуем более толерантно (в случае, если нет паддинга '=' и т.д.);
+        # здесь всегда stdlib — его нестрогий режим задаёт принятую семантику
         try:
-            padded = s + ("=" * ((4 - len(s) % 4) % 4))
+            padded = s + (b"=" * ((4 - len(s) % 4) % 4))
             data = base64.b64decode(padded, validate=False)
             return data
         except Exception:
             raise ValueError(f"Invalid base64 data: {e!s}")
 
+def _padding_len(s: bytes):
+    """
+    Для строки из целых квантов base64 (len % 4 == 0) возвращает длину паддинга '=' в конце
+    (0..2); None — если '=' встречается где-то ещё или длина не кратна 4.
+    """
+    if len(s) % 4:
+        return None
+    body = s.rstrip(b'=')
+    pad = len(s) - len(body)
+    if pad > 2 or b'=' in body:
+        return None
+    return pad
+
+def iter_decoded(lines, strip: bool = True, group: int = DECODE_GROUP, start: int = 1):
+    """
+    Декодирует строки base64 и отдаёт (idx, decoded, error) для каждой строки по порядку:
+    decoded — байты (или memoryview на них), None для пустой строки; error — ValueError или None.
+
+    Подряд идущие строки из целых квантов без паддинга (последняя в группе может быть с паддингом)
+    склеиваются и декодируются одним строгим вызовом: вместо отдельного bytes на каждую строку —
+    один буфер на группу, а payload'ы отдаются срезами memoryview без копирования.
+    Если группа не проходит строгую проверку, её строки декодируются по одной через decode_line,
+    так что результат и сообщения об ошибках в точности те же.
+    start — номер первой строки (для нумерации idx).
+    """
+    pending = []  # (idx, line, stripped, pad)
+
+    def flush():
+        if len(pending) > 1:
+            try:
+                data = _fast_b64decode(b''.join(item[2] for item in pending), validate=True)
+            except binascii.Error:
+                data = None
+            if data is not None:
+                view = memoryview(data)
+                offset = 0
+                for idx, _, stripped, pad in pending:
+                    size = len(stripped) // 4 * 3 - pad
+                    yield idx, view[offset:offset + size], None
+                    offset += size
+                pending.clear()
+                return
+        for idx, raw_line, _, _ in pending:
+            try:
+                yield idx, decode_line(raw_line, strip=strip), None
+            except ValueError as e:
+                yield idx, None, e
+        pending.clear()
+
+    for idx, raw_line in enumerate(lines, start=start):
+        stripped = raw_line.strip() if strip else raw_line
+        pad = _padding_len(stripped) if group > 1 and stripped else None
+        if pad is not None:
+            pending.append((idx, raw_line, stripped, pad))
+            # строка с паддингом закрывает группу: после '=' склеивать дальше нельзя
+            if pad or len(pending) >= group:
+                yield from flush()
+            continue
+        yield from flush()
+        try:
+            yield idx, decode_line(raw_line, strip=strip), None
+        except ValueError as e:
+            yield idx, None, e
+    yield from flush()
+
+def iter_decoded_threaded(lines, threads: int, strip: bool = True, group: int = DECODE_GROUP):
+    """
+    То же, что iter_decoded, но блоки по THREAD_CHUNK строк декодируются в пуле потоков.
+    Результаты отдаются строго по порядку строк; в работе держится не больше threads * 2 блоков,
+    чтобы декодированные данные не копились в памяти быстрее, чем их успевают записать.
+    Ускорение даёт pybase64 — он отпускает GIL на больших входах; stdlib base64 его не отпускает.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as ex:
+        window = deque()
+        for first in range(0, len(lines), THREAD_CHUNK):
+            block = lines[first:first + THREAD_CHUNK]
+            window.append(ex.submit(lambda b, n: list(iter_decoded(b, strip, group, n)), block, first + 1))
+            if len(window) >= threads * 2:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
 def parse_sep(sep_str: str) -> bytes:
     """
     Преобразует строковое представление разделителя в байты.
@@ -82,6 +205,137 @@ def parse_sep(sep_str: str) -> bytes:
         # fallback: raw bytes of the string
         return s.encode('utf-8')
 
+class AggregateWriter:
+    """
+    Запись payload'ов (и сепаратора после каждого) в один агрегатный файл.
+    Буферы копятся списком и уходят в файл scatter-gather вызовом os.writev —
+    один syscall на IOV_BATCH буферов (или AGGREGATE_FLUSH_BYTES байт), без склейки payload'а с сепаратором.
+    Где os.writev нет (Windows), пачка склеивается и пишется одним os.write.
+    """
+
+    def __init__(self, path: Path, sep: bytes):
+        # O_APPEND, как прежний out.open('ab'): существующий агрегатный файл дописывается, а не затирается
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+        self.fd = os.open(path, flags, 0o644)
+        self.parts = []
+        self.buffered = 0
+        self._sep_len = len(sep)
+        # Выбор "с сепаратором / без" делаем один раз, а не проверяем на каждой строке
+        self._add = (lambda data: self.parts.extend((data, sep))) if sep else self.parts.append
+
+    def write(self, data: bytes):
+        self._add(data)
+        self.buffered += len(data) + self._sep_len
+        if len(self.parts) >= IOV_BATCH or self.buffered >= AGGREGATE_FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        parts = self.parts
+        while parts:
+            if hasattr(os, 'writev'):
+                n = os.writev(self.fd, parts)
+            else:
+                n = os.write(self.fd, b''.join(parts))
+            # Отбрасываем полностью записанные буферы; при частичной записи дописываем остаток
+            done = 0
+            while done < len(parts) and n >= len(parts[done]):
+                n -= len(parts[done])
+                done += 1
+            del parts[:done]
+            if n:
+                parts[0] = memoryview(parts[0])[n:]
+        self.buffered = 0
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            os.close(self.fd)
+
+
+def _cqe_res(entry):
+    """Результат CQE как в ядре: liburing на отрицательный res (-errno) возбуждает OSError."""
+    try:
+        return entry.res
+    except OSError as e:
+        return -e.errno
+
+
+class UringFileWriter:
+    """
+    Пакетная запись отдельных файлов через io_uring.
+    Файл открывается синхронно, а write + close ставятся в очередь связкой (IOSQE_IO_LINK);
+    вся пачка уходит в ядро одним submit, когда очередь заполнена, и при flush().
+    """
+
+    def __init__(self, depth: int = URING_DEPTH, quiet: bool = False):
+        self.ring = liburing.Ring()
+        self.cqe = liburing.Cqe()
+        # Может упасть на старом ядре / при запрете io_uring — вызывающий код откатывается на обычную запись
+        liburing.io_uring_queue_init(depth, self.ring)
+        self.max_files = depth // 2  # по два SQE (write + close) на файл
+        self.pending = []  # (path, data, fd, label): держим буферы живыми до завершения операций
+        self.errors = 0
+        # строку "written" печатаем по completion'у записи, а не при постановке в очередь
+        self.quiet = quiet
+
+    def write(self, path: Path, data: bytes, label=None):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        idx = len(self.pending)
+        self.pending.append((path, data, fd, label))
+
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_write(sqe, fd, data)
+        liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_IO_LINK)
+        liburing.io_uring_sqe_set_data64(sqe, idx * 2)
+
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_close(sqe, fd)
+        liburing.io_uring_sqe_set_data64(sqe, idx * 2 + 1)
+
+        if len(self.pending) >= self.max_files:
+            self.flush()
+
+    def flush(self):
+        """Отправляет накопленную пачку и собирает все completion'ы, считая ошибки."""
+        if not self.pending:
+            return
+        liburing.io_uring_submit(self.ring)
+        remaining = len(self.pending) * 2
+        while remaining:
+            liburing.io_uring_wait_cqe(self.ring, self.cqe)
+            ready = liburing.io_uring_cq_ready(self.ring)
+            for i in range(ready):
+                entry = self.cqe[i]
+                tag = liburing.io_uring_cqe_get_data64(entry)
+                path, data, fd, label = self.pending[tag // 2]
+                res = _cqe_res(entry)
+                if tag % 2 == 0:
+                    if res != len(data):
+                        # res < 0 — ошибка (-errno), иначе короткая запись; связка рвётся
+                        print(f"io_uring write failed for {path}: res={res}", file=sys.stderr)
+                        self.errors += 1
+                    elif not self.quiet:
+                        print(f"[{label}] written {len(data)} bytes -> {path}")
+                elif res == -errno.ECANCELED:
+                    # close отменён из-за неудачной записи — закрываем fd сами, иначе он утечёт
+                    os.close(fd)
+                elif res < 0:
+                    # close выполнился с ошибкой: ядро fd уже освободило, повторный close
+                    # мог бы закрыть чужой, заново выданный дескриптор
+                    print(f"io_uring close failed for {path}: res={res}", file=sys.stderr)
+                    self.errors += 1
+            liburing.io_uring_cq_advance(self.ring, ready)
+            remaining -= ready
+        self.pending.clear()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            liburing.io_uring_queue_exit(self.ring)
+
+
 def main():
     p = argparse.ArgumentParser(description="Decode file of base64 lines and preserve exact decoded bytes.")
     p.add_argument('-i', '--input', required=True, help='Input file path (one base64 entry per line)')
@@ -97,6 +351,10 @@ def main():
     p.add_argument('--no-sep', dest='sep', action='store_const', const='', 
                    help='Do NOT add any separator between payloads (equivalent to --sep "").')
     p.add_argument('--quiet', action='store_true', help='Suppress progress prints')
+    p.add_argument('--threads', type=int, default=1,
+                   help='Decode in N worker threads, writing results in input order (default: 1)')
+    p.add_argument('--io-uring', action='store_true',
+                   help='Batch per-payload file writes through io_uring (Linux, requires liburing)')
     args = p.parse_args()
 
     inp = Path(args.input)
@@ -122,12 +380,38 @@ def main():
     written = 0
     errors = 0
 
-    with inp.open('r', encoding='utf-8', errors='replace') as fh:
-        for idx, raw_line in enumerate(fh, start=1):
+    uring = None
+    if args.one_file_per_payload and args.io_uring:
+        if liburing is None:
+            print("liburing не установлен (pip install liburing) — используется обычная запись", file=sys.stderr)
+        else:
             try:
-                decoded = decode_line(raw_line, strip=args.strip)
-            except ValueError as e:
-                print(f"[{idx}] decode error: {e}", file=sys.stderr)
+                uring = UringFileWriter(quiet=args.quiet)
+            except Exception as e:
+                print(f"io_uring недоступен ({e}) — используется обычная запись", file=sys.stderr)
+
+    # Агрегатный файл открываем один раз на весь прогон (и перезаписываем),
+    # а не переоткрываем в режиме 'ab' на каждую строку.
+    ofh = None if args.one_file_per_payload else AggregateWriter(out, sep_bytes)
+    try:
+        # Читаем файл целиком в бинарном режиме и режем на строки в C (без
+        # построчного декодирования utf-8); splitlines понимает \n, \r\n и \r.
+        with inp.open('rb') as fh:
+            blob = fh.read()
+        if args.strip:
+            lines = blob.splitlines()
+        else:
+            # без strip строка сохраняет перевод строки, как в текстовом режиме ('\n')
+            lines = blob.replace(b'\r\n', b'\n').replace(b'\r', b'\n').splitlines(keepends=True)
+        # Группировка отдаёт memoryview — это годится для writev, но не для io_uring/write_bytes по файлам
+        group = 1 if args.one_file_per_payload else DECODE_GROUP
+        if args.threads > 1:
+            results = iter_decoded_threaded(lines, args.threads, strip=args.strip, group=group)
+        else:
+            results = iter_decoded(lines, strip=args.strip, group=group)
+        for idx, decoded, error in results:
+            if error is not None:
+                print(f"[{idx}] decode error: {error}", file=sys.stderr)
                 errors += 1
                 continue
 
@@ -137,22 +421,29 @@ def main():
                     print(f"[{idx}] empty line -> skipped")
                 continue
 
-            if args.one_file_per_payload:
+            if ofh is None:
                 fname = out / f"payload_{idx:05d}{args.ext}"
                 # Записываем точные байты
-                fname.write_bytes(decoded)
-                if not args.quiet:
-                    print(f"[{idx}] written {len(decoded)} bytes -> {fname}")
+                if uring is not None:
+                    # про успех сообщит UringFileWriter, когда запись действительно завершится
+                    uring.write(fname, decoded, idx)
+                else:
+                    fname.write_bytes(decoded)
+                    if not args.quiet:
+                        print(f"[{idx}] written {len(decoded)} bytes -> {fname}")
             else:
-                # В агрегатный файл — дозаписываем байты и затем сепаратор (если он задан)
-                with out.open('ab') as ofh:
-                    ofh.write(decoded)
-                    if sep_bytes:
-                        ofh.write(sep_bytes)
+                # В агрегатный файл — дописываем байты и затем сепаратор (если он задан)
+                ofh.write(decoded)
                 if not args.quiet:
                     sdisplay = sep_bytes.decode('utf-8', errors='replace') if sep_bytes else '<none>'
                     print(f"[{idx}] appended {len(decoded)} bytes + sep({sdisplay}) to {out}")
             written += 1
+    finally:
+        if ofh is not None:
+            ofh.close()
+        if uring is not None:
+            uring.close()
+            errors += uring.errors
 
     print(f"Done. Decoded: {written}, Errors: {errors}. Output: {out}")
 
@@ -1,7 +1,15 @@
 import tkinter as tk
 from tkinter import filedialog
+import mmap
+import os
 import random
 
+# NumPy (если установлен) перемешивает массив в C — заметно быстрее random.shuffle на миллионах строк
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def select_files():
     root = tk.Tk()
     root.withdraw()
@@ -9,18 +17,36 @@ def select_files():
     return list(file_paths)
 
 def read_files(file_paths):
+    """
+    Читает строки всех файлов как bytes (без декодирования и без символов перевода строки).
+    Файл отображается в память через mmap и режется на строки одним вызовом splitlines.
+    """
     all_lines = []
     for path in file_paths:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                all_lines.extend(f.readlines())
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue  # пустой файл нельзя отобразить через mmap
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    all_lines.extend(mm[:].splitlines())
         except Exception as e:
             print(f"Ошибка при чтении файла {path}: {e}")
     return all_lines
 
+def shuffle_lines(lines):
+    """Перемешивает строки и возвращает итоговый список."""
+    if np is None:
+        random.shuffle(lines)
+        return lines
+    arr = np.empty(len(lines), dtype=object)
+    arr[:] = lines
+    np.random.default_rng().shuffle(arr)
+    return arr.tolist()
+
 def write_output(lines, output_path='combined_shuffled.txt'):
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.writelines(lines)
+    with open(output_path, 'wb') as f:
+        if lines:
+            f.write(b'\n'.join(lines) + b'\n')
     print(f"Готово! Итог сохранён в: {output_path}")
 
 def main():
@@ -30,8 +56,7 @@ def main():
         return
 
     all_lines = read_files(files)
-    random.shuffle(all_lines)
-    write_output(all_lines)
+    write_output(shuffle_lines(all_lines))
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,102 @@
-import xml.etree.ElementTree as ET
 import urllib.parse
 import os
 import re
+import string
 import base64 as b64
+import binascii
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 
+# lxml (libxml2) парсит большие выгрузки Burp заметно быстрее; без него — stdlib ElementTree
+try:
+    from lxml import etree as ET
+    # huge_tree: Response в base64 бывает больше лимита libxml2 на текстовый узел (10 МБ);
+    # resolve_entities=False: как и stdlib, не подставляем внешние сущности из чужих XML
+    _ITERPARSE_OPTIONS = {'huge_tree': True, 'resolve_entities': False}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _ITERPARSE_OPTIONS = {}
+
+# pybase64 (SIMD-декодер libbase64), если установлен — для декодирования больших Response
+try:
+    from pybase64 import b64decode as _fast_b64decode
+except ImportError:
+    _fast_b64decode = b64.b64decode
+
+# Индикаторы в ответе: (метка, подстроки). Порядок задаёт порядок меток в отчёте.
+INDICATOR_RULES = (
+    ("SQL Error (Injection Detected)", ("You have an error in your SQL syntax", "mysql_fetch_array", "Error converting data type")),
+    ("WAF/403 Block", ("403 Forbidden", "WAF", "Blocked")),
+    ("Success/Auth Heuristic", ("Welcome", "Logged in", "admin")),
+)
+
+# pyahocorasick (если установлен) ищет все подстроки за один проход по ответу
+try:
+    import ahocorasick
+except ImportError:
+    _INDICATOR_AUTOMATON = None
+else:
+    _INDICATOR_AUTOMATON = ahocorasick.Automaton()
+    for _label_idx, (_label, _needles) in enumerate(INDICATOR_RULES):
+        for _needle in _needles:
+            _INDICATOR_AUTOMATON.add_word(_needle, _label_idx)
+    _INDICATOR_AUTOMATON.make_automaton()
+
+# Шаблон одной записи отчёта (разбирается один раз, а не собирается f-строкой на каждый item)
+_ENTRY_TEMPLATE = (
+    "FILE: %s\n"
+    "  STATUS: %s\n"
+    "  TECHNIQUE: %s\n"
+    "  ORIGINAL: %s\n"
+    "  PAYLOAD: %s\n"
+    "  INDICATORS: %s\n"
+    + "-" * 70 + "\n"
+)
+
+# Значение параметра id: всё после '?id=' до '&', '#' или конца строки
+_ID_RE = re.compile(r'\?id=([^&#\n]*)')
+
+# HEX: чётное число (>= 2) hex-символов после удаления пробелов и ':'
+_HEX_RE = re.compile(r'(?:[0-9A-Fa-f]{2})+')
+_HEX_SEPARATORS = str.maketrans('', '', ' :')
+
+def is_hex_string(value):
+    """Проверяет, является ли строка HEX-последовательностью (разделители ' ' и ':' допускаются)."""
+    return _HEX_RE.fullmatch(value.translate(_HEX_SEPARATORS)) is not None
+
+# Base64: после удаления алфавита, '=' и пробелов не должно остаться ничего
+_B64_ALPHABET_DELETE = str.maketrans('', '', string.ascii_letters + string.digits + '+/= ')
+
+def is_base64_string(value):
+    """Строгая проверка base64 (пробелы игнорируются)."""
+    # Быстрый отсев одним проходом в C: посторонний символ — точно не base64, декодер не нужен
+    if value.translate(_B64_ALPHABET_DELETE):
+        return False
+    # Правила паддинга проверяет сам декодер
+    try:
+        b64.b64decode(value.replace(' ', ''), validate=True)
+        return True
+    except Exception:
+        return False
+
 def decode_base64(data):
     """Декодирует base64-строку для обработки Response."""
     try:
-        data = data.replace(' ', '').replace('\n', '').replace('\r', '') 
+        # base64 — чистый ASCII (иначе UnicodeEncodeError -> None, как и раньше);
+        # пробелы и переводы строк удаляем одним проходом bytes.translate
+        data = data.encode('ascii').translate(None, b' \n\r')
         missing_padding = len(data) % 4
         if missing_padding != 0:
-            data += '=' * (4 - missing_padding)
+            data += b'=' * (4 - missing_padding)
             
-        return b64.b64decode(data).decode('utf-8', errors='ignore')
+        try:
+            # строгий режим у pybase64 и stdlib совпадает; нестрогий pybase64
+            # декодирует и после '=' внутри строки, поэтому его отдаём stdlib
+            decoded = _fast_b64decode(data, validate=True)
+        except binascii.Error:
+            decoded = b64.b64decode(data)
+        return decoded.decode('utf-8', errors='ignore')
     except Exception:
         return None 
 
@@ -22,17 +104,9 @@ def extract_payload_from_path(path_content):
     """
     Извлекает сырое значение, находящееся после '?id=' из содержимого тега <path>.
     """
-    # Ищет '?id=' и захватывает все символы до конца строки (или до другого параметра)
-    match = re.search(r'\?id=(.*)', path_content)
-    
-    if match:
-        raw_payload = match.group(1)
-        # Очистка от потенциальных якорей (#) или следующих параметров (&)
-        raw_payload = raw_payload.split('&')[0].split('#')[0]
-        
-        return raw_payload
-    else:
-        return None
+    # Значение до конца строки, следующего параметра (&) или якоря (#)
+    match = _ID_RE.search(path_content)
+    return match.group(1) if match else None
 
 def determine_technique(raw_payload, decoded_payload):
     """Определяет технику обфускации на основе сырого пейлоада."""
@@ -44,35 +118,26 @@ def determine_technique(raw_payload, decoded_payload):
         return "Empty Payload"
 
     # 1. Проверка на URL-кодирование
-    if '%' in raw_payload:
-        if raw_payload != decoded_payload:
-            
-            # Проверка на вложенный HEX
-            temp_hex = decoded_payload.replace(' ', '').replace(':', '').upper()
-            if all(c in '0123456789ABCDEF' for c in temp_hex) and len(temp_hex) % 2 == 0 and len(temp_hex) > 1:
-                return "URL + HEX Encoding"
-            
-            # Проверка на вложенный Base64
-            if len(decoded_payload) % 4 == 0 or (len(decoded_payload) > 10 and '=' in decoded_payload):
-                try:
-                    b64.b64decode(decoded_payload.replace(' ', ''), validate=True)
-                    return "URL + Base64 Encoding"
-                except:
-                    pass
-            
-            return "URL Encoding"
+    # (без '%' decoded_payload — тот же объект, что raw_payload, и сравнение отсекает ветку за O(1))
+    if raw_payload != decoded_payload and '%' in raw_payload:
+        # Проверка на вложенный HEX
+        if is_hex_string(decoded_payload):
+            return "URL + HEX Encoding"
+        
+        # Проверка на вложенный Base64
+        if len(decoded_payload) % 4 == 0 or (len(decoded_payload) > 10 and '=' in decoded_payload):
+            if is_base64_string(decoded_payload):
+                return "URL + Base64 Encoding"
+        
+        return "URL Encoding"
 
     # 2. Проверка на чистое Base64 (без URL-кодирования)
     if len(raw_payload) % 4 == 0 or '=' in raw_payload:
-        try:
-            b64.b64decode(raw_payload.replace(' ', ''), validate=True)
+        if is_base64_string(raw_payload):
             return "Base64 Encoding"
-        except:
-            pass
 
     # 3. Проверка на чистый HEX
-    temp_hex = raw_payload.replace(' ', '').replace(':', '').upper()
-    if all(c in '0123456789ABCDEF' for c in temp_hex) and len(temp_hex) % 2 == 0 and len(temp_hex) > 1:
+    if is_hex_string(raw_payload):
         return "HEX Encoding"
         
     return "No Obfuscation (Plain Text)"
@@ -83,69 +148,91 @@ def analyze_response(response_base64):
     indicators = []
     
     if decoded_response:
-        if "You have an error in your SQL syntax" in decoded_response or "mysql_fetch_array" in decoded_response or "Error converting data type" in decoded_response:
-            indicators.append("SQL Error (Injection Detected)")
-        if "403 Forbidden" in decoded_response or "WAF" in decoded_response or "Blocked" in decoded_response:
-            indicators.append("WAF/403 Block")
-        if "Welcome" in decoded_response or "Logged in" in decoded_response or "admin" in decoded_response:
-            indicators.append("Success/Auth Heuristic")
+        if _INDICATOR_AUTOMATON is not None:
+            # Один проход автомата по ответу вместо отдельного поиска каждой строки
+            found = set()
+            for _, label_idx in _INDICATOR_AUTOMATON.iter(decoded_response):
+                found.add(label_idx)
+                if len(found) == len(INDICATOR_RULES):
+                    break
+            indicators = [INDICATOR_RULES[i][0] for i in sorted(found)]
+        else:
+            indicators = [label for label, needles in INDICATOR_RULES
+                          if any(needle in decoded_response for needle in needles)]
     
     return " / ".join(indicators) if indicators else "No obvious indicators."
 
 
-def process_burp_file(file_path, output_file):
-    """Парсит один XML-файл и записывает результаты в TXT-файл."""
-    print(f"Обработка файла: {os.path.basename(file_path)}...")
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+def iter_burp_items(file_path):
+    """
+    Потоково отдаёт элементы <item> верхнего уровня (дети корня) из XML-файла.
+    Уже обработанные элементы освобождаются, поэтому в памяти держится только текущий item.
+    """
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(file_path, events=('start', 'end'), **_ITERPARSE_OPTIONS):
+        if event == 'start':
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1 and elem.tag == 'item':
+            yield elem
+            root.clear()
+
 
+def process_burp_file(file_path):
+    """
+    Парсит один XML-файл и возвращает список готовых записей отчёта (строк).
+    Ничего не пишет в отчёт сам, поэтому файлы можно обрабатывать в отдельных процессах.
+    """
+    file_name = os.path.basename(file_path)
+    print(f"Обработка файла: {file_name}...")
+    buf = []
+    try:
         results_count = 0
         
-        with open(output_file, 'a', encoding='utf-8') as f:
-            for item in root.findall('item'):
-                # Извлечение данных
-                path_content = item.find('path').text.strip() if item.find('path') is not None and item.find('path').text else None
-                status = item.find('status').text if item.find('status') is not None else "N/A"
-                response_base64 = item.find('response').text if item.find('response') is not None else None
-                
-                # 1. Извлечение RAW_PAYLOAD (Original)
-                raw_payload = extract_payload_from_path(path_content)
-                
-                # 2. Минимальное декодирование (URL-декодирование) для PAYLOAD
-                if raw_payload is not None:
-                    decoded_payload = urllib.parse.unquote(raw_payload)
-                else:
-                    decoded_payload = "N/A"
-                    raw_payload = "N/A"
-                
-                # Заменяем пустые строки на явное обозначение
-                original_display = "EMPTY STRING" if raw_payload == "" else raw_payload
-                payload_display = "EMPTY STRING" if decoded_payload == "" else decoded_payload
-                
-                # 3. Классификация и анализ
-                technique = determine_technique(raw_payload, decoded_payload)
-                indicators = analyze_response(response_base64)
-                
-                # 4. Запись в файл
-                output_line = (
-                    f"FILE: {os.path.basename(file_path)}\n"
-                    f"  STATUS: {status}\n"
-                    f"  TECHNIQUE: {technique}\n"
-                    f"  ORIGINAL: {original_display}\n"
-                    f"  PAYLOAD: {payload_display}\n"
-                    f"  INDICATORS: {indicators}\n"
-                    f"{'-'*70}\n"
-                )
-                f.write(output_line)
-                results_count += 1
-                        
+        for item in iter_burp_items(file_path):
+            # Извлечение данных (каждый дочерний тег ищем один раз)
+            path_el = item.find('path')
+            status_el = item.find('status')
+            response_el = item.find('response')
+            path_content = path_el.text.strip() if path_el is not None and path_el.text else None
+            status = status_el.text if status_el is not None else "N/A"
+            response_base64 = response_el.text if response_el is not None else None
+            
+            # 1. Извлечение RAW_PAYLOAD (Original)
+            raw_payload = extract_payload_from_path(path_content)
+            
+            # 2. Минимальное декодирование (URL-декодирование) для PAYLOAD
+            if raw_payload is not None:
+                # Без '%' декодировать нечего — не запускаем unquote
+                decoded_payload = urllib.parse.unquote(raw_payload) if '%' in raw_payload else raw_payload
+            else:
+                decoded_payload = "N/A"
+                raw_payload = "N/A"
+            
+            # Заменяем пустые строки на явное обозначение
+            original_display = "EMPTY STRING" if raw_payload == "" else raw_payload
+            payload_display = "EMPTY STRING" if decoded_payload == "" else decoded_payload
+            
+            # 3. Классификация и анализ
+            technique = determine_technique(raw_payload, decoded_payload)
+            indicators = analyze_response(response_base64)
+            
+            # 4. Запись в буфер
+            buf.append(_ENTRY_TEMPLATE % (file_name, status, technique, original_display, payload_display, indicators))
+            results_count += 1
+                    
         print(f"  -> Извлечено {results_count} записей.")
         
     except ET.ParseError as e:
         print(f"Ошибка парсинга XML в файле {file_path}: {e}")
     except Exception as e:
         print(f"Непредвиденная ошибка при обработке {file_path}: {e}")
+    # То, что успели разобрать до ошибки, тоже попадает в отчёт
+    return buf
 
 
 def main():
@@ -156,23 +243,32 @@ def main():
     input_path = args.input_path
     output_filename = "burp_payload_analysis_report.txt"
     
-    # Создание/перезапись заголовочного файла
+    # Создание/перезапись файла отчёта: заголовок, затем записи по всем XML через один дескриптор
     with open(output_filename, 'w', encoding='utf-8') as f:
         f.write(f"--- Сводный отчет по анализу Burp Suite Intruder ---\n")
         f.write(f"Дата генерации: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         f.write(f"Критические поля: TECHNIQUE, ORIGINAL (сырой), PAYLOAD (URL-декодированный), STATUS, INDICATORS\n")
         f.write(f"{'='*70}\n")
 
-    if os.path.isfile(input_path) and input_path.lower().endswith('.xml'):
-        process_burp_file(input_path, output_filename)
-    elif os.path.isdir(input_path):
-        for file_name in os.listdir(input_path):
-            file_path = os.path.join(input_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith('.xml'):
-                process_burp_file(file_path, output_filename)
-    else:
-        print(f"Ошибка: Путь '{input_path}' не является XML-файлом или папкой с XML-файлами.")
-        return
+        if os.path.isfile(input_path) and input_path.lower().endswith('.xml'):
+            f.writelines(process_burp_file(input_path))
+        elif os.path.isdir(input_path):
+            # scandir отдаёт тип файла из getdents — без отдельного stat на каждый файл
+            with os.scandir(input_path) as it:
+                files = [entry.path for entry in it
+                         if entry.is_file() and entry.name.lower().endswith('.xml')]
+            # Файлы независимы и разбор CPU-bound — раздаём их по процессам;
+            # map сохраняет порядок, так что отчёт пишется в том же порядке, что и раньше
+            if len(files) > 1:
+                with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as ex:
+                    for lines in ex.map(process_burp_file, files):
+                        f.writelines(lines)
+            else:
+                for file_path in files:
+                    f.writelines(process_burp_file(file_path))
+        else:
+            print(f"Ошибка: Путь '{input_path}' не является XML-файлом или папкой с XML-файлами.")
+            return
 
     print(f"\n✅ Обработка завершена. Результаты сохранены в файл: {output_filename}")
 
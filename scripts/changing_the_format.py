@@ -1,27 +1,48 @@
-import json
 import os
 from format.transforms import TRANSFORMS  
 
+# orjson (если установлен) разбирает JSON заметно быстрее; читает сразу bytes
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSON_BINARY = True
+except ImportError:
+    import json
+    _json_loads = json.loads
+    _JSON_BINARY = False
+
 def transform_payloads(json_data, transform_name):
+    """
+    Возвращает генератор преобразованных пейлоадов — список целиком в памяти не строится.
+    Неизвестное имя преобразования проверяется сразу, до начала записи.
+    """
     transform_func = TRANSFORMS.get(transform_name)
     if transform_func is None:
         raise ValueError(f"Преобразование {transform_name} не найдено")
-    outputs = []
+    return _iter_transformed(json_data, transform_func)
+
+def _iter_transformed(json_data, transform_func):
     for entry in json_data:
         payload = entry.get('payload', '')
         try:
             transformed = transform_func(payload)
         except Exception:
             transformed = payload
-        outputs.append(transformed)
-    return outputs
+        yield transformed
 
-def main(json_filepath, transform_name):
+def load_json(json_filepath):
+    if _JSON_BINARY:
+        with open(json_filepath, 'rb') as f:
+            return _json_loads(f.read())
     with open(json_filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        return _json_loads(f.read())
 
-    transformed_payloads = transform_payloads(data, transform_name)
+def write_transformed(data, transform_name):
+    """Пишет результат преобразования в tests/json_<имя>.txt и возвращает путь к файлу"""
+    return write_lines(transform_name, transform_payloads(data, transform_name))
 
+def write_lines(transform_name, transformed_payloads):
+    """Пишет уже преобразованные строки в tests/json_<имя>.txt и возвращает путь к файлу"""
     # Создаем папку tests на уровень выше текущей директории скрипта
     tests_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests'))
     os.makedirs(tests_dir, exist_ok=True)
@@ -30,11 +51,13 @@ def main(json_filepath, transform_name):
     filename = f"json_{transform_name}.txt"
     filepath = os.path.join(tests_dir, filename)
 
-    # Записываем построчно
+    # Записываем построчно, потребляя генератор по мере вычисления
     with open(filepath, 'w', encoding='utf-8') as f:
-        for line in transformed_payloads:
-            f.write(line + '\n')
+        f.writelines(f'{line}\n' for line in transformed_payloads)
+    return filepath
 
+def main(json_filepath, transform_name):
+    filepath = write_transformed(load_json(json_filepath), transform_name)
     print(f"Готово! Результат сохранен в {filepath}")
 
 if __name__ == '__main__':
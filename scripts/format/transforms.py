@@ -1,14 +1,84 @@
 from typing import Callable, Dict
+from collections.abc import MutableMapping
 import base64
 import binascii
 import urllib.parse
 import html
 import codecs
-import gzip
+import functools
 import zlib
 import bz2
 import lzma
 import quopri
+import os
+import random
+import re
+import threading
+
+# Опциональные ускорители: ISA-L deflate (SIMD) для gzip и zstandard для zstd-трансформаций
+try:
+    from isal import isal_zlib as _isal_zlib
+except ImportError:
+    _isal_zlib = None
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+# pybase64 (SIMD-кодек с выбором SSSE3/AVX2/NEON во время выполнения), иначе stdlib
+try:
+    import pybase64 as _b64
+
+    _b64encode_str = _b64.b64encode_as_string
+except ImportError:
+    _b64 = base64
+
+    def _b64encode_str(b: bytes) -> str:
+        return base64.b64encode(b).decode('ascii')
+
+# --- Шаблоны deflate-состояний ---
+# copy() уже инициализированного компрессора дешевле, чем создание нового
+# состояния (окно + хеш-таблицы) на каждый вызов zlib.compress/gzip.compress.
+# wbits=31 даёт gzip-обёртку прямо из zlib (mtime в заголовке = 0).
+# gzip.compress по умолчанию использует уровень 9, поэтому оба gzip-шаблона с 9.
+_ZLIB_TMPL = zlib.compressobj(6, zlib.DEFLATED, 15)
+_ZLIB_MAX_TMPL = zlib.compressobj(9, zlib.DEFLATED, 15)
+_GZIP_TMPL = zlib.compressobj(9, zlib.DEFLATED, 31)
+
+def _deflate(tmpl, data: bytes) -> bytes:
+    c = tmpl.copy()
+    return c.compress(data) + c.flush()
+
+if _isal_zlib is not None:
+    # у ISA-L уровни 0-3; максимальный соответствует уровню 9 gzip.compress
+    def _gzip_compress(data: bytes) -> bytes:
+        return _isal_zlib.compress(data, _isal_zlib.ISAL_BEST_COMPRESSION, wbits=31)
+else:
+    def _gzip_compress(data: bytes) -> bytes:
+        return _deflate(_GZIP_TMPL, data)
+
+# ZstdCompressor нельзя использовать из нескольких потоков одновременно (compress()
+# отпускает GIL), поэтому компрессоры свои у каждого потока и создаются один раз на уровень
+_ZSTD_LEVEL = 3
+_ZSTD_MAX_LEVEL = 19
+_zstd_local = threading.local()
+
+def _zstd_compress(data: bytes, level: int) -> bytes:
+    compressors = getattr(_zstd_local, 'compressors', None)
+    if compressors is None:
+        compressors = _zstd_local.compressors = {}
+    c = compressors.get(level)
+    if c is None:
+        c = compressors[level] = zstd.ZstdCompressor(level=level)
+    return c.compress(data)
+
+# --- Байтовые ядра ---
+# Трансформациям, которым нужен только s.encode('utf-8'), соответствует приватное
+# ядро _<имя>_b(b: bytes) -> str; публичная функция str -> str кодирует вход и
+# вызывает ядро. Пара регистрируется здесь для apply_batch, чтобы пачка входов
+# кодировалась в UTF-8 один раз, а не для каждой трансформации.
+_UTF8_CORES: Dict[Callable[[str], str], Callable[[bytes], str]] = {}
 
 # --- Базовые преобразования ---
 
@@ -16,29 +86,54 @@ def noop(s: str) -> str:
     """Возвращает строку без изменений"""
     return s
 
+def _base64_std_b(b: bytes) -> str:
+    return _b64encode_str(b)
+
 def base64_std(s: str) -> str:
     """Стандартное Base64 кодирование"""
-    return base64.b64encode(s.encode('utf-8')).decode('ascii')
+    return _base64_std_b(s.encode('utf-8'))
+_UTF8_CORES[base64_std] = _base64_std_b
+
+def _base64_urlsafe_b(b: bytes) -> str:
+    return _b64.urlsafe_b64encode(b).decode('ascii')
 
 def base64_urlsafe(s: str) -> str:
     """Base64 URL-safe (без '+' и '/')"""
-    return base64.urlsafe_b64encode(s.encode('utf-8')).decode('ascii')
+    return _base64_urlsafe_b(s.encode('utf-8'))
+_UTF8_CORES[base64_urlsafe] = _base64_urlsafe_b
+
+def _base64_nopad_b(b: bytes) -> str:
+    return _b64encode_str(b).rstrip('=')
 
 def base64_nopad(s: str) -> str:
     """Base64 без паддинга '='"""
-    return base64.b64encode(s.encode('utf-8')).decode('ascii').rstrip('=')
+    return _base64_nopad_b(s.encode('utf-8'))
+_UTF8_CORES[base64_nopad] = _base64_nopad_b
+
+def _hex_lower_b(b: bytes) -> str:
+    return binascii.hexlify(b).decode('ascii')
 
 def hex_lower(s: str) -> str:
     """Hex кодировка в нижнем регистре"""
-    return binascii.hexlify(s.encode('utf-8')).decode('ascii')
+    return _hex_lower_b(s.encode('utf-8'))
+_UTF8_CORES[hex_lower] = _hex_lower_b
+
+def _hex_upper_b(b: bytes) -> str:
+    return binascii.hexlify(b).decode('ascii').upper()
 
 def hex_upper(s: str) -> str:
     """Hex кодировка в верхнем регистре"""
-    return binascii.hexlify(s.encode('utf-8')).decode('ascii').upper()
+    return _hex_upper_b(s.encode('utf-8'))
+_UTF8_CORES[hex_upper] = _hex_upper_b
+
+def _backslash_x_b(b: bytes) -> str:
+    # bytes.hex(sep) и str.replace работают в C, без форматирования каждого байта
+    return '\\x' + b.hex(' ').replace(' ', '\\x') if b else ''
 
 def backslash_x(s: str) -> str:
     """Побайтовое представление с экранированием '\\x'"""
-    return ''.join('\\x{:02x}'.format(b) for b in s.encode('utf-8'))
+    return _backslash_x_b(s.encode('utf-8'))
+_UTF8_CORES[backslash_x] = _backslash_x_b
 
 def url_encode_all(s: str) -> str:
     """URL encode всех символов (safe='')"""
@@ -50,91 +145,137 @@ def url_encode_safe_slash(s: str) -> str:
 
 def double_url(s: str) -> str:
     """Двойное URL кодирование"""
-    return urllib.parse.quote(urllib.parse.quote(s, safe=''), safe='')
+    return urllib.parse.quote(s, safe='').replace('%', '%25')
 
 def html_escape_named(s: str) -> str:
     """HTML escape с использованием именованных сущностей"""
     return html.escape(s, quote=True)
 
+_HTML_ASCII_DEC = str.maketrans({ch: f'&#{ord(ch)};' for ch in "<>&\"'"})
+_HTML_ASCII_HEX = str.maketrans({ch: f'&#x{ord(ch):x};' for ch in "<>&\"'"})
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
 def html_numeric_dec(s: str) -> str:
     """HTML escape с десятичными числовыми сущностями"""
-    out = ''.join(f'&#{ord(ch)};' if ord(ch) > 127 or ch in "<>&\"'" else ch for ch in s)
+    out = s.translate(_HTML_ASCII_DEC)
+    # второй проход только при наличии не-ASCII символов
+    if not s.isascii():
+        out = _NON_ASCII_RE.sub(lambda m: f'&#{ord(m.group())};', out)
     return out
 
 def html_numeric_hex(s: str) -> str:
     """HTML escape с шестнадцатеричными числовыми сущностями"""
-    out = ''.join(f'&#x{ord(ch):x};' if ord(ch) > 127 or ch in "<>&\"'" else ch for ch in s)
+    out = s.translate(_HTML_ASCII_HEX)
+    if not s.isascii():
+        out = _NON_ASCII_RE.sub(lambda m: f'&#x{ord(m.group()):x};', out)
     return out
 
 def unicode_escape_python(s: str) -> str:
     """Unicode escape, как в Python"""
     return s.encode('unicode_escape').decode('ascii')
 
+_JS_ESCAPE_TABLE = str.maketrans({i: '\\u{:04x}'.format(i) for i in [*range(32), 127]})
+_JS_ESCAPE_TABLE.update({
+    ord('\n'): '\\n',
+    ord('\r'): '\\r',
+    ord('\t'): '\\t',
+    ord("'"): "\\'",
+    ord('"'): '\\"',
+    ord('\\'): '\\\\',
+})
+
 def js_escape(s: str) -> str:
     """JS-экранирование спецсимволов и юникода"""
-    out = []
-    for ch in s:
-        code = ord(ch)
-        if ch == '\n':
-            out.append('\\n')
-        elif ch == '\r':
-            out.append('\\r')
-        elif ch == '\t':
-            out.append('\\t')
-        elif ch in ("'", '"', '\\'):
-            out.append('\\' + ch)
-        elif 32 <= code < 127:
-            out.append(ch)
-        else:
-            out.append('\\u{:04x}'.format(code))
-    return ''.join(out)
+    out = s.translate(_JS_ESCAPE_TABLE)
+    if s.isascii():
+        return out
+    return _NON_ASCII_RE.sub(lambda m: '\\u{:04x}'.format(ord(m.group())), out)
 
 def rot13(s: str) -> str:
     """ROT13 шифр"""
     return codecs.encode(s, 'rot_13')
 
+_ROT47_TABLE = str.maketrans({c: chr(33 + ((c - 33 + 47) % 94)) for c in range(33, 127)})
+
 def rot47(s: str) -> str:
     """ROT47 шифр"""
-    return ''.join(chr(33 + ((ord(c) - 33 + 47) % 94)) if 33 <= ord(c) <= 126 else c for c in s)
+    return s.translate(_ROT47_TABLE)
+
+def _gzip_base64_b(b: bytes) -> str:
+    gz = _gzip_compress(b)
+    return _b64encode_str(gz)
 
 def gzip_base64(s: str) -> str:
     """Сжатие gzip + Base64"""
-    gz = gzip.compress(s.encode('utf-8'))
-    return base64.b64encode(gz).decode('ascii')
+    return _gzip_base64_b(s.encode('utf-8'))
+_UTF8_CORES[gzip_base64] = _gzip_base64_b
+
+def _zlib_base64_b(b: bytes) -> str:
+    c = _deflate(_ZLIB_TMPL, b)
+    return _b64encode_str(c)
 
 def zlib_base64(s: str) -> str:
     """Сжатие zlib + Base64"""
-    c = zlib.compress(s.encode('utf-8'))
-    return base64.b64encode(c).decode('ascii')
+    return _zlib_base64_b(s.encode('utf-8'))
+_UTF8_CORES[zlib_base64] = _zlib_base64_b
+
+def _bz2_base64_b(b: bytes) -> str:
+    c = bz2.compress(b)
+    return _b64encode_str(c)
 
 def bz2_base64(s: str) -> str:
     """Сжатие bz2 + Base64"""
-    c = bz2.compress(s.encode('utf-8'))
-    return base64.b64encode(c).decode('ascii')
+    return _bz2_base64_b(s.encode('utf-8'))
+_UTF8_CORES[bz2_base64] = _bz2_base64_b
+
+def _lzma_base64_b(b: bytes) -> str:
+    c = lzma.compress(b)
+    return _b64encode_str(c)
 
 def lzma_base64(s: str) -> str:
     """Сжатие lzma + Base64"""
-    c = lzma.compress(s.encode('utf-8'))
-    return base64.b64encode(c).decode('ascii')
+    return _lzma_base64_b(s.encode('utf-8'))
+_UTF8_CORES[lzma_base64] = _lzma_base64_b
+
+def _base32_std_b(b: bytes) -> str:
+    return base64.b32encode(b).decode('ascii')
 
 def base32_std(s: str) -> str:
     """Base32 кодирование"""
-    return base64.b32encode(s.encode('utf-8')).decode('ascii')
+    return _base32_std_b(s.encode('utf-8'))
+_UTF8_CORES[base32_std] = _base32_std_b
+
+def _base85_std_b(b: bytes) -> str:
+    return base64.b85encode(b).decode('ascii')
 
 def base85_std(s: str) -> str:
     """Base85 кодирование"""
-    return base64.b85encode(s.encode('utf-8')).decode('ascii')
+    return _base85_std_b(s.encode('utf-8'))
+_UTF8_CORES[base85_std] = _base85_std_b
+
+def _ascii85_std_b(b: bytes) -> str:
+    return base64.a85encode(b).decode('ascii')
 
 def ascii85_std(s: str) -> str:
     """ASCII85 кодирование"""
-    return base64.a85encode(s.encode('utf-8')).decode('ascii')
+    return _ascii85_std_b(s.encode('utf-8'))
+_UTF8_CORES[ascii85_std] = _ascii85_std_b
+
+# Строка, которую quoted-printable не меняет: печатный ASCII без '=',
+# без пробела в конце и не длиннее строки QP (76 символов); одиночная '.' кодируется
+_QP_IDENTITY_RE = re.compile(r'(?:[ !-<>-~]*[!-<>-~])?')
 
 def quoted_printable(s: str) -> str:
     """Quoted-printable кодирование"""
+    if len(s) <= 76 and s != '.' and _QP_IDENTITY_RE.fullmatch(s):
+        return s
     return quopri.encodestring(s.encode('utf-8')).decode('ascii')
 
 def punycode(s: str) -> str:
     """Punycode кодирование"""
+    # для ASCII punycode — это сама строка и разделитель '-' (пустая остаётся пустой)
+    if s.isascii():
+        return s + '-' if s else s
     try:
         return s.encode('punycode').decode('ascii')
     except Exception:
@@ -144,72 +285,96 @@ def punycode(s: str) -> str:
 
 BYTE_ENCODINGS = ['utf-8', 'latin1', 'cp1251', 'cp1252', 'utf-16le', 'utf-16be', 'utf-7']
 
+def _pct_upper(b: bytes) -> str:
+    # '%' + hex с разделителем '%' собирается целиком в C
+    return '%' + b.hex('%').upper() if b else ''
+
+_BYTES_OUTPUTS: Dict[str, Callable[[bytes], str]] = {
+    'hex': lambda b: binascii.hexlify(b).decode('ascii'),
+    'base64': _b64encode_str,
+    'percent': _pct_upper,
+}
+
+def _apply_bytes(encoding: str, fmt: Callable[[bytes], str], s: str) -> str:
+    try:
+        return fmt(s.encode(encoding, errors='replace'))
+    except Exception:
+        return s
+
 def make_bytes_transform(encoding: str, output: str) -> Callable[[str], str]:
     """Генерирует функцию преобразования строки в указанную байтовую кодировку с последующим выводом в hex/base64/percent"""
-    def f_hex(s: str) -> str:
-        try:
-            b = s.encode(encoding, errors='replace')
-            return binascii.hexlify(b).decode('ascii')
-        except Exception:
-            return s
-    def f_b64(s: str) -> str:
-        try:
-            b = s.encode(encoding, errors='replace')
-            return base64.b64encode(b).decode('ascii')
-        except Exception:
-            return s
-    def f_pct(s: str) -> str:
-        try:
-            b = s.encode(encoding, errors='replace')
-            return ''.join('%%%02X' % byte for byte in b)
-        except Exception:
-            return s
-
-    if output == 'hex':
-        return f_hex
-    if output == 'base64':
-        return f_b64
-    if output == 'percent':
-        return f_pct
-    raise ValueError('unknown')
+    try:
+        fmt = _BYTES_OUTPUTS[output]
+    except KeyError:
+        raise ValueError('unknown') from None
+    f = functools.partial(_apply_bytes, encoding, fmt)
+    if encoding == 'utf-8':
+        # для корректной строки strict и errors='replace' дают одни и те же байты
+        _UTF8_CORES[f] = fmt
+    return f
 
 
 
 # 1. base64 без символов '+' и '/' (замена на '_' и '-')
-def base64_custom_chars(s: str) -> str:
-    b64 = base64.b64encode(s.encode('utf-8')).decode('ascii')
+def _base64_custom_chars_b(b: bytes) -> str:
+    b64 = _b64encode_str(b)
     return b64.replace('+', '_').replace('/', '-')
 
+def base64_custom_chars(s: str) -> str:
+    return _base64_custom_chars_b(s.encode('utf-8'))
+_UTF8_CORES[base64_custom_chars] = _base64_custom_chars_b
+
 # 2. base64 с точками вместо '='
-def base64_dot_pad(s: str) -> str:
-    b64 = base64.b64encode(s.encode('utf-8')).decode('ascii')
+def _base64_dot_pad_b(b: bytes) -> str:
+    b64 = _b64encode_str(b)
     return b64.rstrip('=').ljust(len(b64), '.')
 
+def base64_dot_pad(s: str) -> str:
+    return _base64_dot_pad_b(s.encode('utf-8'))
+_UTF8_CORES[base64_dot_pad] = _base64_dot_pad_b
+
 # 3. Base16 (hex) с разделителями ':'
+def _hex_colon_b(b: bytes) -> str:
+    return b.hex(':')
+
 def hex_colon(s: str) -> str:
-    return ':'.join(f'{b:02x}' for b in s.encode('utf-8'))
+    return _hex_colon_b(s.encode('utf-8'))
+_UTF8_CORES[hex_colon] = _hex_colon_b
 
 # 4. Base16 с пробелами
+def _hex_space_b(b: bytes) -> str:
+    return b.hex(' ')
+
 def hex_space(s: str) -> str:
-    return ' '.join(f'{b:02x}' for b in s.encode('utf-8'))
+    return _hex_space_b(s.encode('utf-8'))
+_UTF8_CORES[hex_space] = _hex_space_b
 
 # 5. Обратный порядок байт в hex
+def _hex_reverse_b(b: bytes) -> str:
+    return b[::-1].hex()
+
 def hex_reverse(s: str) -> str:
-    b = s.encode('utf-8')
-    return binascii.hexlify(b[::-1]).decode('ascii')
+    return _hex_reverse_b(s.encode('utf-8'))
+_UTF8_CORES[hex_reverse] = _hex_reverse_b
 
 # 6. ROT5 для цифр
+_ROT5_TABLE = str.maketrans('0123456789', '5678901234')
+
 def rot5_digits(s: str) -> str:
+    if s.isascii():
+        return s.translate(_ROT5_TABLE)
+    # isdigit() истинно и для не-ASCII цифр, их сохраняем старой формулой
     return ''.join(chr((ord(c) - ord('0') + 5) % 10 + ord('0')) if c.isdigit() else c for c in s)
 
 # 7. ROT13 + base64
 def rot13_base64(s: str) -> str:
     r = codecs.encode(s, 'rot_13')
-    return base64.b64encode(r.encode('utf-8')).decode('ascii')
+    return _b64encode_str(r.encode('utf-8'))
 
 # 8. Base64 с переносами строк через 76 символов (стандарт MIME)
 def base64_mime(s: str) -> str:
-    return '\n'.join(base64.b64encode(s.encode('utf-8')).decode('ascii')[i:i+76] for i in range(0, len(s)*2, 76))
+    b64 = _b64encode_str(s.encode('utf-8'))
+    return '\n'.join(b64[i:i+76] for i in range(0, len(s)*2, 76))
 
 # 9. URL encode с пробелами как '+'
 def url_encode_plus(s: str) -> str:
@@ -223,23 +388,34 @@ def url_decode(s: str) -> str:
         return s
 
 # 11. HTML escape с использованием только числовых ссылок (десятиричных)
+_HTML_NUM_ONLY_TABLE = str.maketrans({c: f'&#{ord(c)};' for c in '&<>"\''})
+
 def html_escape_num_only(s: str) -> str:
-    return ''.join(f'&#{ord(c)};' if c in ['&', '<', '>', '"', "'"] else c for c in s)
+    return s.translate(_HTML_NUM_ONLY_TABLE)
 
 # 12. Hex с префиксом 0x
+def _hex_0x_prefix_b(b: bytes) -> str:
+    return '0x' + b.hex(' ').replace(' ', '0x') if b else ''
+
 def hex_0x_prefix(s: str) -> str:
-    return ''.join(f'0x{b:02x}' for b in s.encode('utf-8'))
+    return _hex_0x_prefix_b(s.encode('utf-8'))
+_UTF8_CORES[hex_0x_prefix] = _hex_0x_prefix_b
 
 # 13. Unicode escape с заглавными X (например \uABCD)
 def unicode_escape_upper(s: str) -> str:
-    return ''.join(f'\\u{ord(c):04X}' if ord(c) > 127 else c for c in s)
+    if s.isascii():
+        return s
+    return _NON_ASCII_RE.sub(lambda m: f'\\u{ord(m.group()):04X}', s)
 
 # 14. Перемешать символы строки (shuffled)
+_RNG = random.Random()
+# как и глобальный генератор random, пересеиваем после fork, иначе воркеры пула
+# получат одинаковое состояние
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_RNG.seed)
+
 def shuffle_string(s: str) -> str:
-    import random
-    lst = list(s)
-    random.shuffle(lst)
-    return ''.join(lst)
+    return ''.join(_RNG.sample(s, len(s)))
 
 # 15. Повторить строку 2 раза
 def repeat_2x(s: str) -> str:
@@ -262,33 +438,47 @@ def reverse_string(s: str) -> str:
     return s[::-1]
 
 # 20. Перевернуть байты UTF-8 и вернуть в hex
+def _reverse_bytes_hex_b(b: bytes) -> str:
+    # bytes.hex() сразу возвращает str, без промежуточного bytes и .decode()
+    return b[::-1].hex()
+
 def reverse_bytes_hex(s: str) -> str:
-    b = s.encode('utf-8')[::-1]
-    return binascii.hexlify(b).decode('ascii')
+    return _reverse_bytes_hex_b(s.encode('utf-8'))
+_UTF8_CORES[reverse_bytes_hex] = _reverse_bytes_hex_b
 
 # 21. Encode в UTF-16LE с BOM, потом base64
 def utf16le_bom_base64(s: str) -> str:
-    b = b'\xff\xfe' + s.encode('utf-16le')
-    return base64.b64encode(b).decode('ascii')
+    return _b64encode_str(codecs.BOM_UTF16_LE + s.encode('utf-16le'))
 
 # 22. Encode в UTF-16BE с BOM, потом base64
 def utf16be_bom_base64(s: str) -> str:
-    b = b'\xfe\xff' + s.encode('utf-16be')
-    return base64.b64encode(b).decode('ascii')
+    return _b64encode_str(codecs.BOM_UTF16_BE + s.encode('utf-16be'))
 
 # 23. Zlib compress с уровнем 9, base64
+def _zlib_max_base64_b(b: bytes) -> str:
+    c = _deflate(_ZLIB_MAX_TMPL, b)
+    return _b64encode_str(c)
+
 def zlib_max_base64(s: str) -> str:
-    c = zlib.compress(s.encode('utf-8'), level=9)
-    return base64.b64encode(c).decode('ascii')
+    return _zlib_max_base64_b(s.encode('utf-8'))
+_UTF8_CORES[zlib_max_base64] = _zlib_max_base64_b
 
 # 24. Gzip compress с уровнем 9, base64
+def _gzip_max_base64_b(b: bytes) -> str:
+    gz = _gzip_compress(b)
+    return _b64encode_str(gz)
+
 def gzip_max_base64(s: str) -> str:
-    gz = gzip.compress(s.encode('utf-8'), compresslevel=9)
-    return base64.b64encode(gz).decode('ascii')
+    return _gzip_max_base64_b(s.encode('utf-8'))
+_UTF8_CORES[gzip_max_base64] = _gzip_max_base64_b
 
 # 25. Преобразовать строку в последовательность ASCII кодов через '-'
+_ASCII_CODES = [str(i) for i in range(128)]
+
 def ascii_codes_dash(s: str) -> str:
-    return '-'.join(str(ord(c)) for c in s)
+    if s.isascii():
+        return '-'.join(map(_ASCII_CODES.__getitem__, s.encode('ascii')))
+    return '-'.join(map(str, map(ord, s)))
 
 # 26. Преобразовать в ASCII коды, затем hex (например "65 66" -> "4146")
 def ascii_codes_to_hex(s: str) -> str:
@@ -296,25 +486,43 @@ def ascii_codes_to_hex(s: str) -> str:
     return binascii.hexlify(codes.encode('ascii')).decode('ascii')
 
 # 27. Base64 encode и удалить все символы '='
+def _base64_no_pad_b(b: bytes) -> str:
+    return _b64encode_str(b).rstrip('=')
+
 def base64_no_pad(s: str) -> str:
-    return base64.b64encode(s.encode('utf-8')).decode('ascii').rstrip('=')
+    return _base64_no_pad_b(s.encode('utf-8'))
+_UTF8_CORES[base64_no_pad] = _base64_no_pad_b
 
 # 28. Base85 encode, потом rot13
-def base85_rot13(s: str) -> str:
-    b85 = base64.b85encode(s.encode('utf-8')).decode('ascii')
+def _base85_rot13_b(b: bytes) -> str:
+    b85 = base64.b85encode(b).decode('ascii')
     return codecs.encode(b85, 'rot_13')
 
+def base85_rot13(s: str) -> str:
+    return _base85_rot13_b(s.encode('utf-8'))
+_UTF8_CORES[base85_rot13] = _base85_rot13_b
+
 # 29. Base32 encode с удалением '='
+def _base32_no_pad_b(b: bytes) -> str:
+    return base64.b32encode(b).decode('ascii').rstrip('=')
+
 def base32_no_pad(s: str) -> str:
-    return base64.b32encode(s.encode('utf-8')).decode('ascii').rstrip('=')
+    return _base32_no_pad_b(s.encode('utf-8'))
+_UTF8_CORES[base32_no_pad] = _base32_no_pad_b
 
 # 30. Удалить все пробелы и табы из строки
+_WS_DELETE = str.maketrans('', '', ' \t')
+
 def remove_whitespace(s: str) -> str:
-    return s.replace(' ', '').replace('\t', '')
+    return s.translate(_WS_DELETE)
 
 # 31. Преобразовать в Unicode codepoints через пробел
+_ASCII_CODEPOINTS = [f'U+{i:04X}' for i in range(128)]
+
 def unicode_codepoints_space(s: str) -> str:
-    return ' '.join(f'U+{ord(c):04X}' for c in s)
+    if s.isascii():
+        return ' '.join(map(_ASCII_CODEPOINTS.__getitem__, s.encode('ascii')))
+    return ' '.join(map('U+%04X'.__mod__, map(ord, s)))
 
 # 32. Экранировать кавычки (")
 def escape_quotes(s: str) -> str:
@@ -325,34 +533,68 @@ def escape_apostrophes(s: str) -> str:
     return s.replace("'", "\\'")
 
 # 34. Base64 encode, но заменить 'A' на '@'
+def _base64_replace_a_b(b: bytes) -> str:
+    return _b64encode_str(b).replace('A', '@')
+
 def base64_replace_a(s: str) -> str:
-    return base64.b64encode(s.encode('utf-8')).decode('ascii').replace('A', '@')
+    return _base64_replace_a_b(s.encode('utf-8'))
+_UTF8_CORES[base64_replace_a] = _base64_replace_a_b
 
 # 35. Quoted-printable с заменой '_' на '=5F'
 def qp_custom(s: str) -> str:
-    qp = quopri.encodestring(s.encode('utf-8')).decode('ascii')
-    return qp.replace('_', '=5F')
+    return quoted_printable(s).replace('_', '=5F')
 
 # 36. hex encode, затем base64 encode
+def _hex_then_base64_b(b: bytes) -> str:
+    # обе стадии в bytes, в str переводится только итоговый base64
+    return _b64encode_str(binascii.hexlify(b))
+
 def hex_then_base64(s: str) -> str:
-    h = binascii.hexlify(s.encode('utf-8'))
-    return base64.b64encode(h).decode('ascii')
+    return _hex_then_base64_b(s.encode('utf-8'))
+_UTF8_CORES[hex_then_base64] = _hex_then_base64_b
 
 # 37. base64 encode, потом hex encode
+def _base64_then_hex_b(b: bytes) -> str:
+    return _b64.b64encode(b).hex()
+
 def base64_then_hex(s: str) -> str:
-    b64 = base64.b64encode(s.encode('utf-8'))
-    return binascii.hexlify(b64).decode('ascii')
+    return _base64_then_hex_b(s.encode('utf-8'))
+_UTF8_CORES[base64_then_hex] = _base64_then_hex_b
 
 # 38. zlib compress, затем hex encode
-def zlib_then_hex(s: str) -> str:
-    c = zlib.compress(s.encode('utf-8'))
+def _zlib_then_hex_b(b: bytes) -> str:
+    c = _deflate(_ZLIB_TMPL, b)
     return binascii.hexlify(c).decode('ascii')
 
+def zlib_then_hex(s: str) -> str:
+    return _zlib_then_hex_b(s.encode('utf-8'))
+_UTF8_CORES[zlib_then_hex] = _zlib_then_hex_b
+
 # 39. lzma compress, затем hex encode
-def lzma_then_hex(s: str) -> str:
-    c = lzma.compress(s.encode('utf-8'))
+def _lzma_then_hex_b(b: bytes) -> str:
+    c = lzma.compress(b)
     return binascii.hexlify(c).decode('ascii')
 
+def lzma_then_hex(s: str) -> str:
+    return _lzma_then_hex_b(s.encode('utf-8'))
+_UTF8_CORES[lzma_then_hex] = _lzma_then_hex_b
+
+# 40. zstd compress (уровень 3), base64
+def _zstd_base64_b(b: bytes) -> str:
+    return _b64encode_str(_zstd_compress(b, _ZSTD_LEVEL))
+
+def zstd_base64(s: str) -> str:
+    return _zstd_base64_b(s.encode('utf-8'))
+_UTF8_CORES[zstd_base64] = _zstd_base64_b
+
+# 41. zstd compress (уровень 19), base64
+def _zstd_max_base64_b(b: bytes) -> str:
+    return _b64encode_str(_zstd_compress(b, _ZSTD_MAX_LEVEL))
+
+def zstd_max_base64(s: str) -> str:
+    return _zstd_max_base64_b(s.encode('utf-8'))
+_UTF8_CORES[zstd_max_base64] = _zstd_max_base64_b
+
 TRANSFORMS: Dict[str, Callable[[str], str]] = {
     'noop': noop,
     'base64': base64_std,
@@ -421,6 +663,11 @@ TRANSFORMS: Dict[str, Callable[[str], str]] = {
     'lzma_then_hex': lzma_then_hex,
 }
 
+# zstd-трансформации доступны только при установленном zstandard
+if zstd is not None:
+    TRANSFORMS['zstd_base64'] = zstd_base64
+    TRANSFORMS['zstd_max_base64'] = zstd_max_base64
+
 for enc in BYTE_ENCODINGS:
     for out in ('hex', 'base64', 'percent'):
         name = f'{enc.replace("-", "")}_{out}'
@@ -429,39 +676,158 @@ for enc in BYTE_ENCODINGS:
 def url_pct_lower(s: str) -> str:
     return urllib.parse.quote(s, safe='').lower()
 
+def _percent_bytes_lower_b(b: bytes) -> str:
+    return '%' + b.hex('%') if b else ''
+
 def percent_bytes_lower(s: str) -> str:
-    b = s.encode('utf-8')
-    return ''.join('%%%02x' % byte for byte in b)
+    return _percent_bytes_lower_b(s.encode('utf-8'))
+_UTF8_CORES[percent_bytes_lower] = _percent_bytes_lower_b
 
 TRANSFORMS['url_pct_lower'] = url_pct_lower
 TRANSFORMS['percent_bytes_lower'] = percent_bytes_lower
 
 def _nested_quote(s: str, n: int) -> str:
-    t = s
-    for _ in range(n):
-        t = urllib.parse.quote(t, safe='')
+    # После первого прохода в строке остаются только безопасные символы и '%XX',
+    # поэтому каждый следующий quote лишь превращает '%' в '%25'. N проходов
+    # сводятся к одному quote и одному replace.
+    if n <= 0:
+        return s
+    t = urllib.parse.quote(s, safe='')
+    if n > 1:
+        t = t.replace('%', '%' + '25' * (n - 1))
     return t
 
 for i in range(2, 6):
     TRANSFORMS[f'double_url_{i}x'] = (lambda n=i: (lambda s: _nested_quote(s, n)))()
 
+# Цепочка -> (первая стадия, вторая стадия). Первая стадия общая у нескольких цепочек
+# (a__then__b, a__then__c, ...), поэтому apply_batch считает её один раз на пачку
+# и переиспользует результат для всех цепочек с тем же началом.
+_CHAIN_PARTS: Dict[Callable[[str], str], tuple] = {}
+
+def make_chain(f1, f2):
+    def chain(s: str) -> str:
+        try:
+            return f2(f1(s))
+        except Exception:
+            return s
+    _CHAIN_PARTS[chain] = (f1, f2)
+    return chain
+
+class _LazyTransforms(MutableMapping):
+    """
+    Словарь трансформаций, в котором цепочки a__then__b создаются при первом обращении.
+    Имена цепочек известны заранее (манифест), поэтому перебор и list_transforms()
+    их не материализуют.
+    """
+
+    def __init__(self, base: Dict[str, Callable[[str], str]], chains: Dict[str, tuple]):
+        self._base = base
+        self._chains = chains
+        self._resolved: Dict[str, Callable[[str], str]] = {}
+
+    def __getitem__(self, key: str) -> Callable[[str], str]:
+        f = self._base.get(key) or self._resolved.get(key)
+        if f is not None:
+            return f
+        pair = self._chains.get(key)
+        if pair is None:
+            raise KeyError(key)
+        a, b = pair
+        f = make_chain(self._base[a], self._base[b])
+        self._resolved[key] = f
+        return f
+
+    def __setitem__(self, key: str, value: Callable[[str], str]) -> None:
+        if key in self._chains:
+            self._resolved[key] = value
+        else:
+            self._base[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._chains:
+            del self._chains[key]
+            self._resolved.pop(key, None)
+        else:
+            del self._base[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._base or key in self._chains
+
+    def __iter__(self):
+        yield from self._base
+        yield from self._chains
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._chains)
+
 existing_keys = list(TRANSFORMS.keys())
 N_pairs = 30
+_CHAINS: Dict[str, tuple] = {}
 for i in range(min(N_pairs, len(existing_keys))):
     for j in range(i+1, min(i+4, len(existing_keys))):
         a = existing_keys[i]
         b = existing_keys[j]
-        name = f'{a}__then__{b}'
-        f_a = TRANSFORMS[a]
-        f_b = TRANSFORMS[b]
-        def make_chain(f1, f2):
-            def chain(s: str) -> str:
-                try:
-                    return f2(f1(s))
-                except Exception:
-                    return s
-            return chain
-        TRANSFORMS[name] = make_chain(f_a, f_b)
+        _CHAINS[f'{a}__then__{b}'] = (a, b)
+
+_BASE_TRANSFORMS = TRANSFORMS
+TRANSFORMS = _LazyTransforms(_BASE_TRANSFORMS, _CHAINS)
+
+def apply_batch(names, inputs) -> Dict[str, list]:
+    """
+    Применяет несколько трансформаций к пачке строк.
+    Каждый вход кодируется в UTF-8 один раз; трансформации с байтовым ядром получают
+    готовые bytes, остальные вызываются как обычно. Как и в changing_the_format,
+    при ошибке преобразования вместо результата остаётся исходная строка.
+    Возвращает dict: имя трансформации -> список результатов в порядке inputs.
+    """
+    inputs = list(inputs)
+    encoded = []
+    for s in inputs:
+        try:
+            encoded.append(s.encode('utf-8'))
+        except Exception:
+            # не str или строка с суррогатами — такие входы идут через str-обёртку
+            encoded.append(None)
+
+    # функции и ядра разрешаются один раз до цикла; неизвестное имя — KeyError сразу
+    items = tuple((name, TRANSFORMS[name]) for name in names)
+    all_encoded = None not in encoded
+
+    results = {}
+    # результаты первых стадий цепочек — живут только в пределах этой пачки
+    stages = {}
+    for name, f in items:
+        parts = _CHAIN_PARTS.get(f)
+        if parts is not None:
+            f1, f2 = parts
+            first = stages.get(f1)
+            if first is None:
+                first = stages[f1] = [_call_or_input(f1, s, _FAILED) for s in inputs]
+            # как в make_chain: ошибка любой стадии оставляет исходную строку
+            results[name] = [s if t is _FAILED else _call_or_input(f2, t, s) for t, s in zip(first, inputs)]
+            continue
+        core = _UTF8_CORES.get(f)
+        if core is not None and all_encoded:
+            fn, args = core, encoded
+        else:
+            fn, args = f, inputs
+        try:
+            out = list(map(fn, args))
+        except Exception:
+            # редкий случай: пересчитываем поштучно, ошибочные входы остаются как есть
+            out = [_call_or_input(fn, a, s) for a, s in zip(args, inputs)]
+        results[name] = out
+    return results
+
+# метка упавшей первой стадии цепочки (None — допустимый результат трансформации)
+_FAILED = object()
+
+def _call_or_input(fn, arg, s):
+    try:
+        return fn(arg)
+    except Exception:
+        return s
 
 # --- Утилиты ---
 def list_transforms() -> list:
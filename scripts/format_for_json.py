@@ -3,7 +3,13 @@ import json
 import argparse
 from pathlib import Path
 
-ENTRY_RE = re.compile(r'(?m)^\s*(\d+)\.\s*(.*?)\s*(?=^\s*\d+\.|\Z)', re.S) #Жесткая регулярка
+# orjson (если установлен) сериализует компактный JSON в bytes целиком и заметно быстрее json.dump
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENTRY_START_RE = re.compile(r'\s*(\d+)\.') # начало записи: '<число>.' в начале строки
 
 def parse_numbered_list(text: str):
     """
@@ -12,15 +18,44 @@ def parse_numbered_list(text: str):
     2. payload...
     Каждая запись может быть многострочной — до следующего '<число>.'
     Возвращает список dict: {'id': int, 'payload': str}
+    Текст проходится один раз построчно, без lookahead и возвратов регулярки.
     """
     items = []
-    for match in ENTRY_RE.finditer(text):
-        idx = int(match.group(1))
-        payload = match.group(2)  
-        payload = payload.strip()   # Убираем ведущие/концевые пробелы и переводы строк с сохр внутренних 
-        items.append({'id': idx, 'payload': payload})
+    match_start = ENTRY_START_RE.match
+    cur_id = None
+    cur_lines = []
+    # делим только по '\n' — как '^' в многострочной регулярке; '\r' остаётся внутри payload
+    for line in text.split('\n'):
+        m = match_start(line)
+        # Как и прежняя регулярка: у записи без текста пробелы после '<число>.' съедаются
+        # вместе с переводами строк, и строка '  N.' с отступом уходит в её payload
+        if m and m.start(1) and cur_id is not None and not ''.join(cur_lines).strip():
+            m = None
+        if m:
+            if cur_id is not None:
+                # Убираем ведущие/концевые пробелы и переводы строк с сохр внутренних
+                items.append({'id': cur_id, 'payload': '\n'.join(cur_lines).strip()})
+            cur_id = int(m.group(1))
+            cur_lines = [line[m.end():]]
+        elif cur_id is not None:
+            cur_lines.append(line)
+    if cur_id is not None:
+        items.append({'id': cur_id, 'payload': '\n'.join(cur_lines).strip()})
     return items
 
+def _write_orjson(items, output_file):
+    """
+    Компактный вывод через orjson — без пробелов после ',' и ':' (тот же JSON по содержимому).
+    Возвращает False, если orjson не может сериализовать данные (например, id больше
+    2**64-1: '\d+' такие номера пропускает) — тогда вызывающий код пишет через json.
+    """
+    try:
+        data = orjson.dumps(items)
+    except TypeError:  # orjson.JSONEncodeError — подкласс TypeError
+        return False
+    output_file.write_bytes(data)
+    return True
+
 def main():
     parser = argparse.ArgumentParser(description='Парсит пронумерованный список в файл JSON')
     parser.add_argument('input_file', type=Path, help='Входной файл с пронумерованным списком')
@@ -37,10 +72,13 @@ def main():
 
     if not items:
         print("Внимание: не найдено записей. Убедись, что формат: '1. payload' на отдельных строках.")
-    with args.output_file.open('w', encoding='utf-8') as f:
-        if args.pretty:
+    if args.pretty:
+        # --pretty всегда через json: orjson умеет только отступ в 2 пробела,
+        # а читаемый вывод не должен зависеть от установленных пакетов
+        with args.output_file.open('w', encoding='utf-8') as f:
             json.dump(items, f, ensure_ascii=False, indent=4)
-        else:
+    elif orjson is None or not _write_orjson(items, args.output_file):
+        with args.output_file.open('w', encoding='utf-8') as f:
             json.dump(items, f, ensure_ascii=False)
     print(f"Готово: записано {len(items)} записей в {args.output_file}")
 
@@ -1,17 +1,82 @@
+import os
 import subprocess
-from format.transforms import TRANSFORMS
+import multiprocessing
+from format.transforms import TRANSFORMS, apply_batch
+import changing_the_format
 
-def main(json_path, script_path):
-    transform_names = sorted(TRANSFORMS.keys())
+# Сколько трансформаций воркер обрабатывает за одну задачу (одна пачка apply_batch)
+BATCH_SIZE = 8
+
+# JSON загружается один раз на процесс-воркер (в инициализаторе пула)
+_worker_payloads = None
+# Ошибка загрузки JSON: исключение в инициализаторе убило бы воркер, и пул
+# перезапускал бы его бесконечно, поэтому ошибка сохраняется и отдаётся по каждой трансформации
+_worker_error = None
+
+def _init_worker(json_path):
+    global _worker_payloads, _worker_error
+    try:
+        data = changing_the_format.load_json(json_path)
+        _worker_payloads = [entry.get('payload', '') for entry in data]
+    except Exception as e:
+        _worker_error = f"{type(e).__name__}: {e}"
+
+def _apply(transforms):
+    """Выполняет пачку преобразований внутри воркера; возвращает список (имя, вывод, ошибка)"""
+    if _worker_error is not None:
+        return [(transform, '', _worker_error) for transform in transforms]
+    try:
+        batch = apply_batch(transforms, _worker_payloads)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return [(transform, '', error) for transform in transforms]
+    out = []
+    for transform in transforms:
+        try:
+            filepath = changing_the_format.write_lines(transform, batch[transform])
+        except Exception as e:
+            out.append((transform, '', f"{type(e).__name__}: {e}"))
+            continue
+        out.append((transform, f"Готово! Результат сохранен в {filepath}\n", None))
+    return out
+
+def _is_inline_script(script_path):
+    # changing_the_format.py — тонкая CLI-обёртка, её логику выполняем в пуле без запуска интерпретатора
+    return os.path.basename(script_path) == 'changing_the_format.py'
+
+def _run_subprocess(json_path, script_path, transform_names):
     for transform in transform_names:
-        print(f"Запускаем преобразование: {transform}")
         # Формируем команду
         cmd = ['python', script_path, json_path, transform]
         result = subprocess.run(cmd, capture_output=True, text=True)
-        print(result.stdout)
-        if result.returncode != 0:
-            print(f"Ошибка при выполнении трансформации {transform}:")
-            print(result.stderr)
+        yield transform, result.stdout, result.stderr if result.returncode != 0 else None
+
+def main(json_path, script_path):
+    transform_names = sorted(TRANSFORMS.keys())
+    if _is_inline_script(script_path):
+        pool = multiprocessing.Pool(initializer=_init_worker, initargs=(json_path,))
+        batches = [transform_names[i:i + BATCH_SIZE] for i in range(0, len(transform_names), BATCH_SIZE)]
+        results = (item for batch in pool.imap(_apply, batches) for item in batch)
+    else:
+        pool = None
+        results = _run_subprocess(json_path, script_path, transform_names)
+    try:
+        # imap сохраняет порядок, поэтому вывод совпадает с последовательным запуском
+        for transform, stdout, error in results:
+            print(f"Запускаем преобразование: {transform}")
+            print(stdout)
+            if error is not None:
+                print(f"Ошибка при выполнении трансформации {transform}:")
+                print(error)
+    except BaseException:
+        # при ошибке или Ctrl-C не ждём оставшиеся в очереди пачки
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
 
 if __name__ == '__main__':
     import sys
@@ -1,13 +1,76 @@
+import mmap
 import os
 import re
-from collections import Counter
+import sys
+from collections import Counter, namedtuple
 from datetime import datetime
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import argparse
 import base64 as b64
-from io import BytesIO
+from io import BytesIO, StringIO
 import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
+# Шаблоны компилируются один раз при импорте, а не ищутся в кеше re на каждую запись
+# Разделитель ищется прямо в mmap файла, поэтому шаблон байтовый
+_SEP_RE = re.compile(rb'-{70,}')
+_PAT_FILE = re.compile(r'FILE: (.+)')
+_PAT_STATUS = re.compile(r'STATUS: (.+)')
+_PAT_TECHNIQUE = re.compile(r'TECHNIQUE: (.+)')
+_PAT_ORIGINAL = re.compile(r'ORIGINAL: (.+)')
+_PAT_PAYLOAD = re.compile(r'PAYLOAD: (.+)')
+_PAT_INDICATORS = re.compile(r'INDICATORS: (.+)')
+# Пейлоады — это данные SQLi/XSS, поэтому всё пользовательское экранируется
+# перед вставкой в HTML; translate проходит строку одним циклом в C
+_HTML_ESC = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'})
+
+
+def esc(s):
+    """Экранирует спецсимволы HTML в строке."""
+    return s.translate(_HTML_ESC)
+
+
+MAX_PAYLOAD_LEN = 100
+
+# Строка отчёта: уже отформатированный HTML и минимум полей для статистики
+ReportRow = namedtuple('ReportRow', 'html status technique is_test_value')
+
+# Цвета статусов: контрольные пейлоады и обычные (фоновые) записи
+_TEST_STATUS_COLORS = {"200": "green", "403": "red", "500": "red"}
+_STATUS_COLORS = {"200": "darkgreen", "403": "darkred", "500": "darkred"}
+
+_FIELD_PATTERNS = (
+    ('FILE', _PAT_FILE),
+    ('STATUS', _PAT_STATUS),
+    ('TECHNIQUE', _PAT_TECHNIQUE),
+    ('ORIGINAL', _PAT_ORIGINAL),
+    ('PAYLOAD', _PAT_PAYLOAD),
+    ('INDICATORS', _PAT_INDICATORS),
+)
+# Все поля записи за один проход finditer вместо шести search
+_FIELDS_RE = re.compile(r'(FILE|STATUS|TECHNIQUE|ORIGINAL|PAYLOAD|INDICATORS): (.+)')
+
+
+def _extract_fields(entry):
+    """
+    Возвращает dict: поле -> первое найденное значение (без strip).
+    Если внутри значения встречается другое 'ПОЛЕ: ...' (такое бывает в пейлоадах),
+    один проход дал бы другой результат, чем отдельный поиск каждого поля, поэтому
+    для такой записи поля ищутся по отдельности.
+    """
+    fields = {}
+    for match in _FIELDS_RE.finditer(entry):
+        value = match.group(2)
+        if _FIELDS_RE.search(value):
+            fields = {}
+            for key, pattern in _FIELD_PATTERNS:
+                found = pattern.search(entry)
+                if found:
+                    fields[key] = found.group(1)
+            return fields
+        fields.setdefault(match.group(1), value)
+    return fields
 
 def load_test_values(folder_path):
     """
@@ -16,44 +79,155 @@ def load_test_values(folder_path):
     """
     test_values = set()
     if not folder_path:
-        return test_values
+        return frozenset(test_values)
         
     if not os.path.isdir(folder_path):
         print(f"⚠️ Предупреждение: Папка для сравнения не найдена: '{folder_path}'. Будут обработаны все запросы без выделения контрольных.")
-        return test_values
+        return frozenset(test_values)
         
-    for file_name in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, file_name)
-        if os.path.isfile(file_path) and file_name.lower().endswith('.txt'):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    # Читаем все строки, удаляем пробелы и пустые строки, добавляем в множество
-                    for line in f:
-                        stripped_line = line.strip()
-                        # Контрольный список имеет пейлоады без обфускации.
-                        # Дополнительно очищаем, если они в стиле TXT-примера (%255Cx27...)
-                        # Для чистоты сравнения здесь не декодируем, но оставляем 
-                        # возможность, что пейлоад может быть сложным.
-                        if stripped_line:
-                            test_values.add(stripped_line)
-            except Exception as e:
-                print(f"Ошибка при чтении файла для сравнения {file_path}: {e}")
+    # scandir отдаёт тип файла вместе с именем — без отдельного stat() на каждый файл
+    with os.scandir(folder_path) as it:
+        txt_paths = [entry.path for entry in it if entry.name.lower().endswith('.txt') and entry.is_file()]
+    for file_path in txt_paths:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                # Читаем все строки, удаляем пробелы и пустые строки, добавляем в множество
+                for line in f:
+                    stripped_line = line.strip()
+                    # Контрольный список имеет пейлоады без обфускации.
+                    # Дополнительно очищаем, если они в стиле TXT-примера (%255Cx27...)
+                    # Для чистоты сравнения здесь не декодируем, но оставляем 
+                    # возможность, что пейлоад может быть сложным.
+                    if stripped_line:
+                        # intern: при совпадении хеша сравнение сводится к сравнению указателей
+                        test_values.add(sys.intern(stripped_line))
+        except Exception as e:
+            print(f"Ошибка при чтении файла для сравнения {file_path}: {e}")
 
     print(f"Загружено {len(test_values)} уникальных значений для сравнения из '{folder_path}'.")
-    return test_values
+    return frozenset(test_values)
+
+
+def _decode_entry(raw):
+    """Декодирует запись и приводит переводы строк к '\n', как это делает текстовый режим open()."""
+    text = raw.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+@lru_cache(maxsize=8)
+def _test_prefixes(test_values):
+    """
+    Первые символы контрольных значений. Пейлоад с другим первым символом
+    заведомо не в test_values, и длинную строку не приходится хешировать.
+    Frozenset хеширует себя один раз, поэтому кеш по test_values дешёвый.
+    """
+    return frozenset(value[:1] for value in test_values)
+
+
+def _iter_entries(file_path):
+    """
+    Отдаёт записи TXT-файла между разделителями из 70+ '-'.
+    Файл отображается в память (mmap), и разделители ищутся байтовой регуляркой
+    прямо по страницам файла; в str декодируется только текущая запись.
+    Результат тот же, что у re.split(r'-{70,}', f.read()): '-' — ASCII и не
+    встречается внутри многобайтовых символов UTF-8, так что запись всегда
+    режется по границе символа.
+    """
+    with open(file_path, 'rb') as f:
+        # mmap не умеет отображать пустой файл
+        if os.fstat(f.fileno()).st_size == 0:
+            yield ''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            for match in _SEP_RE.finditer(mm):
+                yield _decode_entry(mm[start:match.start()])
+                start = match.end()
+            yield _decode_entry(mm[start:])
+
+
+# Шаблон строки таблицы для %-подстановки из dict: один проход в C на строку
+_ROW_TEMPLATE = """
+            <tr class="%(row_class)s">
+                <td>%(index)d</td>
+                <td style="word-break: break-all;">%(file)s</td>
+                <td style="color: %(status_color)s; font-weight: bold;">%(status)s</td>
+                <td>%(technique)s</td>
+                <td>
+                    <div class="tooltip">%(original_short)s
+                        <span class="tooltiptext">%(original_full)s</span>
+                    </div>
+                </td>
+                <td>
+                    <div class="tooltip">%(payload_short)s
+                        <span class="tooltiptext">%(payload_full)s</span>
+                    </div>
+                </td>
+                <td>
+                    <div class="tooltip">%(indicators_short)s
+                        <span class="tooltiptext">%(indicators_full)s</span>
+                    </div>
+                </td>
+            </tr>
+        """
+
+
+def short(s, n):
+    """Обрезает строку до n символов, добавляя '...' если она была длиннее."""
+    head = s[:n]
+    return head if len(head) == len(s) else head + '...'
+
+
+@lru_cache(maxsize=1024)
+def _shorten_indicators(indicators):
+    # Индикаторов всего несколько видов на весь отчёт, поэтому результат
+    # textwrap.shorten (разбор по словам) кешируется, а не считается для каждой строки
+    return textwrap.shorten(indicators, width=30, placeholder='...')
+
+
+def _format_row(index, file, status, status_color, technique, original_full, payload_full, indicators_full, is_test_value):
+    """Собирает HTML строки таблицы сразу при парсинге, чтобы не обходить результаты второй раз."""
+    original_short = short(original_full, MAX_PAYLOAD_LEN)
+    payload_short = short(payload_full, MAX_PAYLOAD_LEN)
+    
+    indicators_short = _shorten_indicators(indicators_full)
+    
+    # Определяем CSS класс для всей строки, если это контрольный пейлоад
+    row_class = ""
+    if is_test_value:
+        if status == "200":
+            row_class = "test-row-pass"
+        elif status in ["403", "500"]:
+            row_class = "test-row-block"
+
+    return _ROW_TEMPLATE % {
+        'row_class': row_class,
+        'index': index,
+        'file': esc(file),
+        'status_color': status_color,
+        'status': esc(status),
+        'technique': esc(technique),
+        'original_short': esc(original_short),
+        'original_full': esc(original_full),
+        'payload_short': esc(payload_short),
+        'payload_full': esc(payload_full),
+        'indicators_short': esc(indicators_short),
+        'indicators_full': esc(indicators_full),
+    }
 
 
 def parse_txt_to_data(file_path, test_values):
     """
     Читает и парсит один TXT-файл, извлекая все необходимые поля, 
     и определяет цвет статуса, учитывая контрольные значения.
+    Возвращает список ReportRow: готовый HTML строки таблицы и поля для статистики.
     """
     data = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        entries = re.split(r'-{70,}', content)
+        entries = _iter_entries(file_path)
+        prefixes = _test_prefixes(test_values) if test_values else frozenset()
         
         index_counter = 1
         
@@ -62,56 +236,38 @@ def parse_txt_to_data(file_path, test_values):
             if not entry:
                 continue
                 
-            match_file = re.search(r'FILE: (.+)', entry)
-            match_status = re.search(r'STATUS: (.+)', entry)
-            match_technique = re.search(r'TECHNIQUE: (.+)', entry)
-            match_original = re.search(r'ORIGINAL: (.+)', entry)
-            match_payload = re.search(r'PAYLOAD: (.+)', entry)
-            match_indicators = re.search(r'INDICATORS: (.+)', entry)
+            fields = _extract_fields(entry)
             
-            if match_status and match_technique:
-                status = match_status.group(1).strip()
-                payload = match_payload.group(1).strip() if match_payload else "N/A"
+            if 'STATUS' in fields and 'TECHNIQUE' in fields:
+                status = fields['STATUS'].strip()
+                payload = fields['PAYLOAD'].strip() if 'PAYLOAD' in fields else "N/A"
 
-                is_test_value = False
-                status_color = "black"
-                
-                # 1. Проверяем, является ли это значением из контрольного списка
-                if test_values and payload in test_values:
-                    is_test_value = True
-                    # 2. Определяем цвет для контрольных значений
-                    if status == "200":
-                        status_color = "green"  # УСПЕХ: Прошёл WAF!
-                    elif status in ["403", "500"]:
-                        status_color = "red"    # БЛОКИРОВКА/ОШИБКА: Заблокирован WAF
-                    elif status.startswith("3"):
-                        status_color = "darkorange" # Редирект
-                    else:
-                        status_color = "purple" # Неожиданный контрольный статус
+                # 1. Проверяем, является ли это значением из контрольного списка.
+                # Сначала дешёвая проверка первого символа: intern (и хеширование всей строки)
+                # нужен только пейлоадам, которые могут оказаться в test_values
+                is_test_value = payload[:1] in prefixes and sys.intern(payload) in test_values
+                if is_test_value:
+                    # 2. Цвет для контрольных значений: 200 — прошёл WAF, 403/500 — заблокирован,
+                    # 3xx — редирект, прочее — неожиданный контрольный статус
+                    status_color = _TEST_STATUS_COLORS.get(status) or ("darkorange" if status.startswith("3") else "purple")
                 else:
-                    # 3. Определяем цвет для обычных значений (фоновые)
-                    if status == "200":
-                        status_color = "darkgreen" 
-                    elif status in ["403", "500"]:
-                        status_color = "darkred"   
-                    elif status.startswith("3"):
-                        status_color = "orange"
-                    else:
-                        status_color = "black"
+                    # 3. Цвет для обычных значений (фоновые)
+                    status_color = _STATUS_COLORS.get(status) or ("orange" if status.startswith("3") else "black")
                 # --------------------------------------------
 
-                data.append({
-                    "index": index_counter,
-                    "file": match_file.group(1).strip() if match_file else "N/A",
-                    "status": status,
-                    "status_color": status_color, 
-                    "technique": match_technique.group(1).strip(),
-                    "original": match_original.group(1).strip() if match_original else "N/A",
-                    "payload": payload,
-                    "indicators": match_indicators.group(1).strip() if match_indicators else "N/A",
-                    "response_length": 0,
-                    "is_test_value": is_test_value # Флаг для потенциальной стилизации всей строки
-                })
+                technique = fields['TECHNIQUE'].strip()
+                row_html = _format_row(
+                    index_counter,
+                    fields['FILE'].strip() if 'FILE' in fields else "N/A",
+                    status,
+                    status_color,
+                    technique,
+                    fields['ORIGINAL'].strip() if 'ORIGINAL' in fields else "N/A",
+                    payload,
+                    fields['INDICATORS'].strip() if 'INDICATORS' in fields else "N/A",
+                    is_test_value,
+                )
+                data.append(ReportRow(row_html, status, technique, is_test_value))
                 index_counter += 1
                 
         return data
@@ -120,15 +276,37 @@ def parse_txt_to_data(file_path, test_values):
         return []
 
 
+# Контрольные значения в процессе-воркере пула (см. main): передаются один раз при старте
+_worker_test_values = frozenset()
+
+
+def _init_parse_worker(test_values):
+    global _worker_test_values
+    # после pickle строки уже не интернированы — интернируем заново, как в load_test_values
+    _worker_test_values = frozenset(sys.intern(value) for value in test_values)
+
+
+def _parse_in_worker(file_path):
+    return parse_txt_to_data(file_path, _worker_test_values)
+
+
 def generate_statistics(results):
     """Генерирует статистику по запросам."""
     total_requests = len(results)
-    status_counts = Counter(item['status'] for item in results)
-    technique_counts = Counter(item['technique'] for item in results)
+    status_counts = Counter()
+    technique_counts = Counter()
     
-    # Подсчет контрольных/неконтрольных значений
-    test_passed_count = sum(1 for item in results if item['is_test_value'] and item['status'] == "200")
-    test_blocked_count = sum(1 for item in results if item['is_test_value'] and item['status'] in ["403", "500"])
+    # Подсчет контрольных/неконтрольных значений — всё за один проход по results
+    test_passed_count = test_blocked_count = 0
+    for item in results:
+        status = item.status
+        status_counts[status] += 1
+        technique_counts[item.technique] += 1
+        if item.is_test_value:
+            if status == "200":
+                test_passed_count += 1
+            elif status in ("403", "500"):
+                test_blocked_count += 1
     
     stats = f"""
     <div class="statistics">
@@ -147,14 +325,14 @@ def generate_statistics(results):
     """
     for status, count in sorted(status_counts.items(), key=lambda item: item[1], reverse=True):
         color = "green" if status == "200" else "red" if status in ["403", "500"] else "orange" if status.startswith("3") else "black"
-        stats += f'<li><span style="color: {color}">HTTP {status}</span>: {count} ({(count/total_requests)*100:.1f}%)</li>'
+        stats += f'<li><span style="color: {color}">HTTP {esc(status)}</span>: {count} ({(count/total_requests)*100:.1f}%)</li>'
     stats += """
         </ul>
         <h3>Распределение по техникам обфускации:</h3>
         <ul>
     """
     for technique, count in sorted(technique_counts.items(), key=lambda item: item[1], reverse=True):
-        stats += f'<li>{technique}: {count} ({(count/total_requests)*100:.1f}%)</li>'
+        stats += f'<li>{esc(technique)}: {count} ({(count/total_requests)*100:.1f}%)</li>'
     stats += """
         </ul>
     </div>
@@ -169,32 +347,38 @@ def generate_chart(technique_counts):
     labels = technique_counts.keys()
     sizes = technique_counts.values()
     
-    plt.figure(figsize=(10, 8))
+    # Figure напрямую (Agg-холст по умолчанию) — без pyplot, GUI-бэкенда и глобального состояния
+    fig = Figure(figsize=(10, 8))
+    ax = fig.subplots()
     
     def absolute_value(val):
         a = sum(sizes)
         return f'{(val/a)*100:.1f}%\n({int(round(val))})'
         
-    plt.pie(sizes, labels=labels, autopct=absolute_value, startangle=140, 
+    ax.pie(sizes, labels=labels, autopct=absolute_value, startangle=140, 
                 textprops={'fontsize': 10, 'color': 'black'}, wedgeprops={'edgecolor': 'white'})
     
-    plt.title("Распределение использованных техник обфускации", pad=20)
-    plt.axis('equal') 
-    plt.tight_layout()
+    ax.set_title("Распределение использованных техник обфускации", pad=20)
+    ax.axis('equal') 
     
+    # tight_layout не нужен: bbox_inches='tight' и так обрезает поля по содержимому
     buffer = BytesIO()
-    plt.savefig(buffer, format='png', bbox_inches='tight')
-    plt.close()
-    buffer.seek(0)
-    img_base64 = b64.b64encode(buffer.getvalue()).decode('utf-8')
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    # getbuffer() — memoryview без копии буфера; base64 — чистый ASCII
+    img_base64 = b64.b64encode(buffer.getbuffer()).decode('ascii')
     return img_base64
 
 def generate_html(results, stats_html, chart_base64):
-    """Генерирует финальную HTML-страницу."""
-    
-    MAX_PAYLOAD_LEN = 100
+    """Генерирует финальную HTML-страницу и возвращает её строкой."""
+    buffer = StringIO()
+    write_html(results, stats_html, chart_base64, buffer)
+    return buffer.getvalue()
+
+
+def write_html(results, stats_html, chart_base64, out_f):
+    """Пишет финальную HTML-страницу в открытый файл частями, без накопления одной большой строки."""
     
-    html_content = """
+    out_f.write("""
     <!DOCTYPE html>
     <html lang="ru">
     <head>
@@ -295,19 +479,19 @@ def generate_html(results, stats_html, chart_base64):
     <body>
         <h1>Финальный Сводный Отчёт по Анализу Атак Burp Suite</h1>
         <p style="text-align: center; font-style: italic;">Данные агрегированы из всех предоставленных TXT-отчетов. <span style="font-weight: bold;">Строки с контрольными пейлоадами выделены цветом.</span></p>
-    """
+    """)
     
-    html_content += stats_html
+    out_f.write(stats_html)
     
     if chart_base64:
-        html_content += f"""
+        out_f.write(f"""
         <h2>Распределение Техник Обфускации (График)</h2>
         <div style="overflow-x: auto; margin-top: 20px; padding: 10px; background-color: #fff; border-radius: 8px; box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1); text-align: center;">
             <img src="data:image/png;base64,{chart_base64}" alt="Obfuscation Techniques Pie Chart" style="width: 100%; max-width: 800px; display: inline-block;">
         </div>
-        """
+        """)
         
-    html_content += """
+    out_f.write("""
         <h2>Детализация Запросов (Сырые и Декодированные Пейлоады)</h2>
         <div class="table-wrapper">
         <table>
@@ -320,61 +504,19 @@ def generate_html(results, stats_html, chart_base64):
                 <th style="min-width: 400px;">Payload (Декодированный)</th>
                 <th style="min-width: 300px;">Indicators</th>
             </tr>
-    """
-    for item in results:
-        original_full = item['original']
-        payload_full = item['payload']
-        indicators_full = item['indicators']
-
-        original_short = original_full[:MAX_PAYLOAD_LEN] + ('...' if len(original_full) > MAX_PAYLOAD_LEN else '')
-        payload_short = payload_full[:MAX_PAYLOAD_LEN] + ('...' if len(payload_full) > MAX_PAYLOAD_LEN else '')
-        
-        indicators_short = textwrap.shorten(indicators_full, width=30, placeholder='...')
-        
-        # Определяем CSS класс для всей строки, если это контрольный пейлоад
-        row_class = ""
-        if item['is_test_value']:
-            if item['status'] == "200":
-                row_class = "test-row-pass"
-            elif item['status'] in ["403", "500"]:
-                row_class = "test-row-block"
-
-
-        html_content += f"""
-            <tr class="{row_class}">
-                <td>{item['index']}</td>
-                <td style="word-break: break-all;">{item['file']}</td>
-                <td style="color: {item['status_color']}; font-weight: bold;">{item['status']}</td>
-                <td>{item['technique']}</td>
-                <td>
-                    <div class="tooltip">{original_short}
-                        <span class="tooltiptext">{original_full}</span>
-                    </div>
-                </td>
-                <td>
-                    <div class="tooltip">{payload_short}
-                        <span class="tooltiptext">{payload_full}</span>
-                    </div>
-                </td>
-                <td>
-                    <div class="tooltip">{indicators_short}
-                        <span class="tooltiptext">{indicators_full}</span>
-                    </div>
-                </td>
-            </tr>
-        """
+    """)
+    for row in results:
+        out_f.write(row.html)
     
-    html_content += """
+    out_f.write("""
         </table>
         </div>
-    """
+    """)
     
-    html_content += """
+    out_f.write("""
     </body>
     </html>
-    """
-    
-    return html_content
+    """)
 
 
 def main():
@@ -401,9 +543,17 @@ def main():
     if os.path.isfile(input_path) and input_path.lower().endswith('.txt'):
         all_results.extend(parse_txt_to_data(input_path, test_values))
     elif os.path.isdir(input_path):
-        for file_name in os.listdir(input_path):
-            file_path = os.path.join(input_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith('.txt'):
+        with os.scandir(input_path) as it:
+            file_paths = [entry.path for entry in it if entry.name.lower().endswith('.txt') and entry.is_file()]
+        if len(file_paths) > 1:
+            # Парсинг упирается в CPU (регулярки), поэтому файлы разбираются в отдельных процессах;
+            # map сохраняет порядок файлов, а test_values уходит в каждый воркер один раз (initargs),
+            # а не вместе с каждой задачей
+            with ProcessPoolExecutor(initializer=_init_parse_worker, initargs=(test_values,)) as ex:
+                for rows in ex.map(_parse_in_worker, file_paths):
+                    all_results.extend(rows)
+        else:
+            for file_path in file_paths:
                 all_results.extend(parse_txt_to_data(file_path, test_values))
     else:
         print(f"Ошибка: Путь '{input_path}' не является TXT-файлом или папкой с TXT-файлами.")
@@ -417,9 +567,8 @@ def main():
     stats_html, technique_counts = generate_statistics(all_results)
     chart_base64 = generate_chart(technique_counts)
 
-    html_content = generate_html(all_results, stats_html, chart_base64)
     with open(output_filename, "w", encoding="utf-8") as f:
-        f.write(html_content)
+        write_html(all_results, stats_html, chart_base64, f)
 
     print(f"\n✅ Обработка завершена. Финальный, красивый HTML-отчёт сохранён как: {output_filename}")
 
@@ -11,6 +11,7 @@ url_generator.py
 """
 
 import argparse
+import asyncio
 import time
 from datetime import datetime
 from pathlib import Path
@@ -24,23 +25,33 @@ try:
 except Exception:
     requests = None
 
-# для глобального rate limit
-_last_call = 0.0
-_last_lock = Lock()
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
+
+# для глобального rate limit: время (time.monotonic) следующего разрешённого GET
+_next_slot = [0.0]
+_slot_lock = Lock()
 
 def read_wordlist(path: Path) -> List[str]:
     with path.open("r", encoding="utf-8", errors="ignore") as f:
         return [line.strip() for line in f if line.strip()]
 
+# форматы, которые пробуем по очереди для ISO-подобного --time
+_TIME_FMTS = ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
 def format_time(user_time: str, time_format: str) -> str:
     if user_time.lower() == "now":
         return datetime.now().strftime(time_format)
-    try:
-        epoch = int(user_time)
-        return datetime.fromtimestamp(epoch).strftime(time_format)
-    except Exception:
-        pass
-    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+    # int() пробуем только если строка может быть числом — исключение дороже проверки
+    if user_time.strip().lstrip("+-")[:1].isdigit():
+        try:
+            epoch = int(user_time)
+            return datetime.fromtimestamp(epoch).strftime(time_format)
+        except Exception:
+            pass
+    for fmt in _TIME_FMTS:
         try:
             return datetime.strptime(user_time, fmt).strftime(time_format)
         except Exception:
@@ -48,17 +59,17 @@ def format_time(user_time: str, time_format: str) -> str:
     return user_time  # literal
 
 def generate_urls(words: List[str], url_template: str, time_str: str) -> List[str]:
-    urls = []
-    for w in words:
-        safe_word = quote_plus(w, encoding="utf-8", errors="ignore")
-        u = url_template.replace("{word}", safe_word).replace("{time}", time_str)
-        urls.append(u)
-    return urls
+    # шаблон режем по {word} один раз, {time} подставляем в куски заранее
+    parts = [part.replace("{time}", time_str) for part in url_template.split("{word}")]
+    q = quote_plus
+    if len(parts) == 2:
+        prefix, suffix = parts
+        return [prefix + q(w) + suffix for w in words]
+    return [q(w).join(parts) for w in words]
 
 def save_urls(urls: List[str], out_path: Path):
-    with out_path.open("w", encoding="utf-8") as f:
-        for u in urls:
-            f.write(u + "\n")
+    # одна склеенная строка и один write() вместо записи по каждому URL
+    out_path.write_text("\n".join(urls) + "\n" if urls else "", encoding="utf-8")
 
 def fetch_url(session, url, timeout=10, delay_mode=0, delay=0.0):
     """
@@ -67,23 +78,60 @@ def fetch_url(session, url, timeout=10, delay_mode=0, delay=0.0):
       1 - per-thread delay before request (time.sleep(delay) inside each task)
       2 - global strict rate limit (ensure at least `delay` seconds between real GETs)
     """
-    global _last_call
     try:
         if delay_mode == 1 and delay:
             time.sleep(delay)
         elif delay_mode == 2 and delay:
-            with _last_lock:
-                now = time.time()
-                wait = delay - (now - _last_call)
-                if wait > 0:
-                    time.sleep(wait)
-                _last_call = time.time()
+            # под lock только резервируем слот, спим уже без него
+            with _slot_lock:
+                now = time.monotonic()
+                slot = max(now, _next_slot[0])
+                _next_slot[0] = slot + delay
+            if slot > now:
+                time.sleep(slot - now)
 
         r = session.get(url, timeout=timeout)
         return url, r.status_code, len(r.content)
     except Exception as e:
         return url, "ERR", str(e)
 
+async def fetch_url_async(session, sem, url, timeout=10, delay_mode=0, delay=0.0, next_slot=None):
+    """
+    Асинхронный аналог fetch_url. sem ограничивает число запросов в полёте,
+    next_slot — общий для всех корутин список [время следующего разрешённого GET]
+    (для delay_mode 2; корутины работают в одном потоке, поэтому lock не нужен).
+    """
+    async with sem:
+        try:
+            if delay_mode == 1 and delay:
+                await asyncio.sleep(delay)
+            elif delay_mode == 2 and delay:
+                now = asyncio.get_running_loop().time()
+                slot = max(now, next_slot[0])
+                next_slot[0] = slot + delay
+                if slot > now:
+                    await asyncio.sleep(slot - now)
+
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+                body = await r.read()
+                return url, r.status, len(body)
+        except Exception as e:
+            return url, "ERR", str(e)
+
+async def run_async(urls, workers, delay_mode=0, delay=0.0, timeout=10):
+    sem = asyncio.Semaphore(workers)
+    next_slot = [0.0]
+    results = []
+    # у TCPConnector по умолчанию limit=100 — без явного limit он срезал бы --workers до 100
+    connector = aiohttp.TCPConnector(limit=workers)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [fetch_url_async(session, sem, u, timeout, delay_mode, delay, next_slot) for u in urls]
+        for fut in asyncio.as_completed(tasks):
+            url, status, info = await fut
+            results.append((url, status, info))
+            print(url, status, info)
+    return results
+
 def main():
     p = argparse.ArgumentParser(description="Генератор URL из словаря и времени.")
     p.add_argument("--wordlist", "-w", required=True, help="путь к txt (по одному слову в строке)")
@@ -96,10 +144,13 @@ def main():
     p.add_argument("--out", "-o", default="generated_urls.txt", help="файл для записи URL")
     p.add_argument("--send", action="store_true", help="выполнять GET запросы (по умолчанию OFF)")
     p.add_argument("--delay", type=float, default=1.0, help="пауза в секундах (см. --delay-mode)")
-    p.add_argument("--workers", type=int, default=4, help="параллельных потоков для отправки")
+    p.add_argument("--workers", type=int, default=4,
+                   help="параллельных потоков для отправки (с --async — одновременных запросов)")
     p.add_argument("--max-urls", type=int, default=0, help="максимум URL для генерации (0 = все)")
     p.add_argument("--delay-mode", type=int, choices=[0,1,2], default=2,
                    help="0=no delay, 1=per-thread pre-request sleep, 2=global strict rate limit (default)")
+    p.add_argument("--async", dest="async_mode", action="store_true",
+                   help="отправлять запросы через asyncio + aiohttp вместо потоков")
     args = p.parse_args()
 
     wl = Path(args.wordlist)
@@ -117,6 +168,20 @@ def main():
     print(f"Сгенерировано {len(urls)} URL, сохранено в {args.out}")
 
     if args.send:
+        if args.async_mode:
+            if aiohttp is None:
+                print("aiohttp не установлен. Установите: pip install aiohttp")
+                return
+            if args.workers < 1:
+                # Semaphore(0) заблокировал бы все корутины навсегда, а TCPConnector(limit=0) — без лимита
+                print("--workers должен быть >= 1")
+                return
+
+            print("=== ВНИМАНИЕ: отправка запросов включена (--send). Убедитесь, что у вас есть разрешение! ===")
+            results = asyncio.run(run_async(urls, args.workers, args.delay_mode, args.delay))
+            print("Отправлено. Всего:", len(results))
+            return
+
         if requests is None:
             print("requests не установлен. Установите: pip install requests")
             return